@@ -1,41 +1,120 @@
 """Lambda Handler."""
-import asyncio
-from fastapi import *
-from fastapi.responses import *
-from fastapi.templating import *
-from fastapi.staticfiles import *
-from bs4 import BeautifulSoup
-from typing import *
-from pydantic import *
-from datetime import *
-from aiohttp import *
-from enum import Enum
+from functools import cached_property, lru_cache
+from hashlib import sha256
+from fastapi import FastAPI, Request, Response, Depends, HTTPException, UploadFile, File
+from fastapi.responses import RedirectResponse
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple, Type, Union, TYPE_CHECKING
+from pydantic import BaseModel, BaseConfig, Extra, HttpUrl, AnyHttpUrl, EmailStr, IPvAnyAddress, IPvAnyInterface, IPvAnyNetwork
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from aiohttp import ClientResponse, ClientSession, ClientTimeout, TCPConnector, TraceConfig
+from asyncio import AbstractEventLoop, CancelledError, Future, Semaphore, Task, TimeoutError as WaitTimeout, gather, get_running_loop, shield, sleep, wait_for
+from random import uniform
+from heapq import heappop, heappush
+from itertools import count
+from collections import OrderedDict
+from contextvars import ContextVar
+from time import time
 from os import environ, getenv
-from decimal import *
+from decimal import Decimal
 from dotenv import load_dotenv
-from aioboto3 import Session
-from boto3 import Session as Boto3Session
-from boto3.dynamodb.types import Binary
-from boto3.dynamodb.conditions import Key
-from botocore.exceptions import ClientError, ParamValidationError, BotoCoreError
 from json import dumps, loads
-from uuid import uuid4
-from zipfile import ZipFile
+from logging import getLogger
+
+# bs4, boto3/aioboto3 and Jinja2 are imported on first use by the routes that need them,
+# keeping them out of the cold start of every other route.
+if TYPE_CHECKING:
+    from aioboto3 import Session
+    from botocore.config import Config
+    from bs4 import BeautifulSoup
+    from fastapi.templating import Jinja2Templates
 
 
 load_dotenv()
 
+logger = getLogger("app")
+
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (X11; Linux x86_64; rv:78.0) Gecko/20100101 Firefox/78.0"}
 AUTH0_DOMAIN = getenv("AUTH0_DOMAIN")
+# API identifier of the access tokens; when set and PyJWT is installed, tokens are verified locally.
+AUTH0_AUDIENCE = getenv("AUTH0_AUDIENCE")
 AWS_ACCESS_KEY_ID = getenv("AWS_ACCESS_KEY_ID")
 AWS_SECRET_ACCESS_KEY = getenv("AWS_SECRET_ACCESS_KEY")
 AWS_DEFAULT_REGION = getenv("AWS_DEFAULT_REGION")
+AWS_SESSION_TOKEN = getenv("AWS_SESSION_TOKEN")
 AWS_S3_BUCKET = getenv("AWS_S3_BUCKET")
 AWS_SES_EMAIL = getenv("AWS_SES_EMAIL")
 FAUNA_SECRET = getenv("FAUNA_SECRET")
 GOOGLE_URL = "https://www.google.com/search?q="        
 PYPI_URL = "https://pypi.org/search/?q="
+# Lets the adapter's response cache serve repeat searches and pages from a warm container.
+CACHE_CONTROL = {"Cache-Control": "public, max-age=300"}
+# Epoch deadline of the current invocation, set from the `aws.deadline` the adapter puts in the scope.
+DEADLINE: "ContextVar[Union[float, None]]" = ContextVar("DEADLINE", default=None)
+# Timeout of outbound calls made outside an invocation, or when the adapter sets no deadline.
+DEFAULT_TIMEOUT = 30.0
+# Connect and per-read timeouts of outbound HTTP calls, within the deadline above.
+HTTP_CONNECT_TIMEOUT = 5.0
+HTTP_READ_TIMEOUT = 10.0
+
+def parse_html(html:str)->"BeautifulSoup":
+    """Parse HTML, importing BeautifulSoup on first use."""
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(html,"html.parser")
+
+def remaining_time()->float:
+    """Seconds left before the invocation deadline, never less than a tenth of a second."""
+    deadline = DEADLINE.get()
+    if deadline is None:
+        return DEFAULT_TIMEOUT
+    return max(deadline - time(), 0.1)
+
+def client_timeout()->ClientTimeout:
+    """Aiohttp timeout that gives up before the invocation deadline."""
+    return ClientTimeout(total=remaining_time(), connect=HTTP_CONNECT_TIMEOUT, sock_read=HTTP_READ_TIMEOUT)
+
+def aws_config()->"Config":
+    """Botocore config whose connect and read timeouts end at the invocation deadline."""
+    from botocore.config import Config
+    timeout = remaining_time()
+    return Config(connect_timeout=timeout, read_timeout=timeout)
+
+class DeadlineMiddleware:
+    """Expose the invocation deadline from the ASGI scope to outbound clients."""
+    def __init__(self, app:Any)->None:
+        self.app = app
+
+    async def __call__(self, scope:Dict[str,Any], receive:Any, send:Any)->None:
+        token = DEADLINE.set(scope.get("aws.deadline"))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            DEADLINE.reset(token)
+
+@lru_cache(maxsize=None)
+def aws_errors()->Tuple[Type[Exception],...]:
+    """Botocore exceptions, imported on first use."""
+    from botocore.exceptions import ClientError, ParamValidationError, BotoCoreError
+    return (ClientError, ParamValidationError, BotoCoreError)
+
+@lru_cache(maxsize=None)
+def dynamodb_types()->Any:
+    """Import boto3's DynamoDB types on first use and register the Binary encoder on every DynaModel."""
+    from boto3.dynamodb import types
+    models = [DynaModel]
+    while models:
+        model = models.pop()
+        model.__config__.json_encoders[types.Binary] = bytes
+        models.extend(model.__subclasses__())
+    return types
+
+# DynamoDB's per-request limits for BatchGetItem and BatchWriteItem, and the retry schedule for unprocessed requests.
+BATCH_GET_SIZE = 100
+BATCH_WRITE_SIZE = 25
+BATCH_ATTEMPTS = 8
+BATCH_BACKOFF_BASE = 0.05
+BATCH_BACKOFF_CAP = 2.0
 
 entity_types = ["PERSON", "LOCATION", "ORGANIZATION", "COMMERCIAL_ITEM", "EVENT", "DATE", "QUANTITY", "TITLE", "OTHER"]
 
@@ -44,62 +123,226 @@ class WebSite(BaseModel):
     html:str
 
 class HTTPClient:   
-    """Aiohttp client session"""
+    """Aiohttp client sharing one pooled session per container, so warm invocations reuse open connections."""
+    def __init__(self, limit:int=100, limit_per_host:int=10, ttl_dns_cache:int=300, keepalive_timeout:float=30.0)->None:
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.ttl_dns_cache = ttl_dns_cache
+        self.keepalive_timeout = keepalive_timeout
+        self.stats = {"hits": 0, "misses": 0}
+        self._session: Optional[ClientSession] = None
+        self._loop: Optional[AbstractEventLoop] = None
+        self.verifier = TokenVerifier(self, AUTH0_DOMAIN, AUTH0_AUDIENCE)
+
+    async def _on_reuse(self, session:ClientSession, context:Any, params:Any)->None:
+        self.stats["hits"] += 1
+
+    async def _on_create(self, session:ClientSession, context:Any, params:Any)->None:
+        self.stats["misses"] += 1
+
+    @property
+    def session(self)->ClientSession:
+        """The shared session, opened on first use on the running event loop."""
+        loop = get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            trace = TraceConfig()
+            trace.on_connection_reuseconn.append(self._on_reuse)
+            trace.on_connection_create_end.append(self._on_create)
+            connector = TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.ttl_dns_cache,
+                keepalive_timeout=self.keepalive_timeout)
+            self._session = ClientSession(
+                connector=connector,
+                timeout=ClientTimeout(connect=HTTP_CONNECT_TIMEOUT, sock_read=HTTP_READ_TIMEOUT),
+                trace_configs=[trace])
+            self._loop = loop
+        return self._session
+
+    async def close(self)->None:
+        """Close the shared session and its pooled connections."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        logger.info("HTTP connection pool: %s reused, %s opened", self.stats["hits"], self.stats["misses"])
+
     async def html(self,url: str)->str:
         """Fetch HTML from URL."""
-        async with ClientSession() as session:
-            async with session.get(url=url, headers=HEADERS) as response:
-                return await response.text(encoding="utf-8")
+        async with self.session.get(url=url, headers=HEADERS, timeout=client_timeout()) as response:
+            return await response.text(encoding="utf-8")
             
     async def json(self,url: Union[str,HttpUrl],headers:Dict[str,Any])->Dict[str,Any]:
         """Fetch JSON from URL."""
-        async with ClientSession() as session:
-            async with session.get(url=url, headers=headers) as response:
-                return await response.json()
+        async with self.session.get(url=url, headers=headers, timeout=client_timeout()) as response:
+            return await response.json()
             
     async def blob(self,url: str)->bytes:
         """Fetch BLOB from URL."""
-        async with ClientSession() as session:
-            async with session.get(url) as response:
-                return await response.read()
+        async with self.session.get(url, timeout=client_timeout()) as response:
+            return await response.read()
 
-    async def soup(self,url:str)->BeautifulSoup:
+    async def soup(self,url:str)->"BeautifulSoup":
         """Parse HTML from URL."""
-        async with ClientSession() as session:
-            async with session.get(url=url, headers=HEADERS) as response:
-                html = await response.text(encoding="utf-8")
-                return BeautifulSoup(html,"html.parser")
+        return parse_html(await self.html(url))
 
     async def auth(self, req:Request)->Dict[str,Any]:
         """Lambda Authorizer."""
-        token = req.headers.get("Authorization").split(" ")[1]
-        return await self.json(f"https://{AUTH0_DOMAIN}/userinfo", {"Authorization": f"Bearer {token}"})
+        scheme, _, token = req.headers.get("Authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            raise HTTPException(status_code=401, detail="Missing bearer token")
+        return await self.verifier.verify(token)
     
     
     async def text(self,url: str)->str:
         """Fetch text from URL."""
-        async with ClientSession() as session:
-            async with session.get(url=url, headers=HEADERS) as response:
-                return await response.text(encoding="utf-8")
+        return await self.html(url)
+
+class TokenVerifier:
+    """Verifies Auth0 bearer tokens without a round trip to Auth0 on every request.
+
+    JWT access tokens are validated locally against the tenant's JWKS when an audience is configured and PyJWT
+    is installed. Other tokens are exchanged at `/userinfo`, and the result is kept in a TTL-bounded LRU keyed by
+    the token's SHA-256, so repeat calls from the same user stay in the container."""
+    def __init__(self, http:HTTPClient, domain:Optional[str], audience:Optional[str]=None, ttl:float=300.0, maxsize:int=1024, jwks_ttl:float=3600.0)->None:
+        self.http = http
+        self.domain = domain
+        self.audience = audience
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.jwks_ttl = jwks_ttl
+        self.userinfo_cache:"OrderedDict[str, Tuple[float, Dict[str,Any]]]" = OrderedDict()
+        self.keys:Dict[str,Any] = {}
+        self.keys_fetched_at = 0.0
+
+    @cached_property
+    def jwt(self)->Any:
+        """PyJWT, or None when it is not installed."""
+        try:
+            import jwt
+        except ImportError:
+            return None
+        return jwt
+
+    async def verify(self, token:str)->Dict[str,Any]:
+        """Claims of a valid access token, or the user's profile; raises a 401 otherwise."""
+        if self.audience and self.jwt is not None and token.count(".") == 2:
+            return await self.verify_jwt(token)
+        return await self.userinfo(token)
+
+    async def signing_key(self, kid:str)->Any:
+        """Public key for `kid`, refreshing the JWKS when it is stale or the key is unknown (at most once a minute)."""
+        age = time() - self.keys_fetched_at
+        if age > self.jwks_ttl or (kid not in self.keys and age > 60):
+            jwks = await self.http.json(f"https://{self.domain}/.well-known/jwks.json", {})
+            self.keys = {jwk["kid"]: self.jwt.PyJWK(jwk).key for jwk in jwks.get("keys", []) if "kid" in jwk}
+            self.keys_fetched_at = time()
+        if kid not in self.keys:
+            raise HTTPException(status_code=401, detail="Unknown signing key")
+        return self.keys[kid]
+
+    async def verify_jwt(self, token:str)->Dict[str,Any]:
+        """Validate the signature, expiry, audience and issuer of a JWT access token locally."""
+        jwt = self.jwt
+        try:
+            key = await self.signing_key(jwt.get_unverified_header(token).get("kid", ""))
+            return jwt.decode(token, key, algorithms=["RS256"], audience=self.audience, issuer=f"https://{self.domain}/")
+        except jwt.PyJWTError as exception:
+            raise HTTPException(status_code=401, detail=str(exception))
+
+    async def userinfo(self, token:str)->Dict[str,Any]:
+        """The `/userinfo` profile for a token, served from the cache while it is fresh."""
+        key = sha256(token.encode()).hexdigest()
+        cached = self.userinfo_cache.get(key)
+        if cached is not None and cached[0] > time():
+            self.userinfo_cache.move_to_end(key)
+            return cached[1]
+        async with self.http.session.get(f"https://{self.domain}/userinfo", headers={"Authorization": f"Bearer {token}"}, timeout=client_timeout()) as response:
+            if response.status != 200:
+                self.userinfo_cache.pop(key, None)
+                raise HTTPException(status_code=401, detail="Invalid token")
+            user = await response.json()
+        self.userinfo_cache[key] = (time() + self.ttl, user)
+        self.userinfo_cache.move_to_end(key)
+        while len(self.userinfo_cache) > self.maxsize:
+            self.userinfo_cache.popitem(last=False)
+        return user
+
+class CredentialProvider:
+    """Process-wide temporary credentials from STS, shared by every DynaModel through one aioboto3 session.
+
+    Credentials are fetched once and refreshed in the background `refresh_margin` seconds before they expire, so
+    callers only wait on STS for the first fetch or after the credentials have lapsed. When STS fails, the default
+    credential chain is used until a retry, with exponential backoff, succeeds. Role credentials, such as a Lambda
+    execution role's, cannot request a session token, so STS is skipped for them and the default chain is used as is."""
+    def __init__(self, duration:int=3600, refresh_margin:float=300.0, retry_base:float=1.0, retry_cap:float=300.0)->None:
+        self.duration = duration
+        self.refresh_margin = refresh_margin
+        self.retry_base = retry_base
+        self.retry_cap = retry_cap
+        self.expires_at = 0.0
+        self.refresh_at = 0.0
+        self.failures = 0
+        self._session:Optional["Session"] = None
+        self._refresh:Optional[Task] = None
+
+    async def session(self)->"Session":
+        """The shared session, with credentials that are valid now."""
+        now = time()
+        if self._session is None or now >= self.expires_at:
+            await shield(self.refresh())
+        elif now >= self.refresh_at:
+            self.refresh()
+        assert self._session is not None
+        return self._session
+
+    def refresh(self)->Task:
+        """Start fetching new credentials, unless a fetch is already running."""
+        if self._refresh is None or self._refresh.done():
+            self._refresh = get_running_loop().create_task(self._fetch())
+            self._refresh.add_done_callback(self._log_failure)
+        return self._refresh
+
+    def _log_failure(self, task:Task)->None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Refreshing AWS credentials failed", exc_info=task.exception())
+
+    async def _fetch(self)->None:
+        from aioboto3 import Session
+        base = Session(region_name=AWS_DEFAULT_REGION)
+        if AWS_SESSION_TOKEN:
+            # Already temporary credentials, which the default credential chain refreshes itself.
+            self._session = base
+            self.expires_at = self.refresh_at = float("inf")
+            return
+        try:
+            async with base.client("sts", config=aws_config()) as sts:
+                credentials = (await sts.get_session_token(DurationSeconds=self.duration))["Credentials"]
+        except aws_errors() as exception:
+            delay = min(self.retry_cap, self.retry_base * 2 ** self.failures)
+            self.failures += 1
+            logger.warning("Fetching a session token failed, retrying in %.1fs: %s", delay, exception)
+            if self._session is None or time() >= self.expires_at:
+                self._session = base
+                self.expires_at = float("inf")
+            self.refresh_at = time() + delay
+            return
+        self._session = Session(
+            aws_access_key_id=credentials["AccessKeyId"],
+            aws_secret_access_key=credentials["SecretAccessKey"],
+            aws_session_token=credentials["SessionToken"],
+            region_name=AWS_DEFAULT_REGION)
+        self.expires_at = credentials["Expiration"].timestamp()
+        self.refresh_at = self.expires_at - self.refresh_margin
+        self.failures = 0
+
+CREDENTIALS = CredentialProvider()
 
 class DynaModel(BaseModel):
     """Wrapper for DynamoDB"""
     def __init__(self,**data: Any) -> None:
-        try:
-            super().__init__(**data)  
-            boto3_session=Boto3Session(
-                    aws_access_key_id=AWS_ACCESS_KEY_ID,
-                    aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-                    region_name=AWS_DEFAULT_REGION)            
-            sts = boto3_session.client("sts")
-            credentials = sts.get_session_token()["Credentials"]
-            self.session = Session(
-                aws_access_key_id=credentials["AccessKeyId"],
-                aws_secret_access_key=credentials["SecretAccessKey"],
-                aws_session_token=credentials["SessionToken"],
-                region_name=AWS_DEFAULT_REGION)
-        except (ClientError, ParamValidationError, BotoCoreError):
-            pass
+        super().__init__(**data)
+        dynamodb_types()
        
     class Config(BaseConfig):
         """Base Configuration settings for Pydantic models."""
@@ -109,7 +352,6 @@ class DynaModel(BaseModel):
         json_encoders = {
             datetime: str,
             Decimal: float,
-            Binary: bytes,
             HttpUrl: str,
             EmailStr: str,
             IPvAnyAddress: str,
@@ -170,7 +412,7 @@ class DynaModel(BaseModel):
 
     async def create_table(self):
         """Create table."""
-        async with self.session.client("dynamodb") as client:
+        async with (await CREDENTIALS.session()).client("dynamodb", config=aws_config()) as client:
             try:
                 await client.create_table(
                     TableName=self.table,
@@ -185,12 +427,12 @@ class DynaModel(BaseModel):
                     BillingMode="PAY_PER_REQUEST",
                 )
                 await client.get_waiter("table_exists").wait(TableName=self.table)
-            except (ClientError, ParamValidationError, BotoCoreError):
+            except aws_errors():
                 pass
 
     async def get(self)->Dict[str,Any]:
         """Find unique item by primary key."""
-        async with self.session.resource("dynamodb") as dynamodb:
+        async with (await CREDENTIALS.session()).resource("dynamodb", config=aws_config()) as dynamodb:
             table = await dynamodb.Table(self.table)
             response = await table.get_item(
                 Key={
@@ -202,7 +444,7 @@ class DynaModel(BaseModel):
             
     async def post(self)->Dict[str,Any]:
         """Create new item."""
-        async with self.session.resource("dynamodb") as dynamodb:
+        async with (await CREDENTIALS.session()).resource("dynamodb", config=aws_config()) as dynamodb:
             table = await dynamodb.Table(self.table)
             await table.put_item(
                 Item=self.dict()
@@ -211,7 +453,7 @@ class DynaModel(BaseModel):
     
     async def update(self)->Dict[str,Any]:
         """Update item."""
-        async with self.session.resource("dynamodb") as dynamodb:
+        async with (await CREDENTIALS.session()).resource("dynamodb", config=aws_config()) as dynamodb:
             table = await dynamodb.Table(self.table)
             await table.update_item(
                 Key={
@@ -226,7 +468,7 @@ class DynaModel(BaseModel):
         
     async def delete(self)->Dict[str,Any]:
         """Delete item."""
-        async with self.session.resource("dynamodb") as dynamodb:
+        async with (await CREDENTIALS.session()).resource("dynamodb", config=aws_config()) as dynamodb:
             table = await dynamodb.Table(self.table)
             await table.delete_item(
                 Key={
@@ -238,7 +480,8 @@ class DynaModel(BaseModel):
         
     async def query(self)->Dict[str,Any]:
         """Query items."""
-        async with self.session.resource("dynamodb") as dynamodb:
+        from boto3.dynamodb.conditions import Key
+        async with (await CREDENTIALS.session()).resource("dynamodb", config=aws_config()) as dynamodb:
             table = await dynamodb.Table(self.table)
             response = await table.query(
                 KeyConditionExpression=Key(self._pk).eq(self.pk)
@@ -247,62 +490,354 @@ class DynaModel(BaseModel):
         
     async def scan(self)->List[Dict[str,Any]]:
         """Scan items."""
-        async with self.session.resource("dynamodb") as dynamodb:
+        async with (await CREDENTIALS.session()).resource("dynamodb", config=aws_config()) as dynamodb:
             table = await dynamodb.Table(self.table)
             response = await table.scan()
             return response.pop("Items")
 
+    @classmethod
+    def _key(cls, item:Union["DynaModel",Dict[str,Any]])->Dict[str,Any]:
+        """Primary key of a model or of a dict holding at least the key fields."""
+        data = item.dict() if isinstance(item, DynaModel) else item
+        return {field: data[field] for field in cls.__fields__ if cls.__fields__[field].field_info.extra.get("pk") or cls.__fields__[field].field_info.extra.get("sk")}
+
+    @staticmethod
+    async def _until_processed(call:Callable[..., Any], request:Dict[str,Any], unprocessed:str)->List[Dict[str,Any]]:
+        """Send a batch request, resending whatever DynamoDB leaves unprocessed with jittered exponential backoff."""
+        responses: List[Dict[str,Any]] = []
+        for attempt in range(BATCH_ATTEMPTS):
+            response = await call(RequestItems=request)
+            responses.append(response)
+            request = response.get(unprocessed)
+            if not request:
+                return responses
+            if attempt < BATCH_ATTEMPTS - 1:
+                await sleep(uniform(0, min(BATCH_BACKOFF_CAP, BATCH_BACKOFF_BASE * 2 ** attempt)))
+        raise RuntimeError(f"DynamoDB left requests unprocessed after {BATCH_ATTEMPTS} attempts")
+
+    @classmethod
+    async def _run_batches(cls, requests:List[Any], size:int, concurrency:int, send:Callable[[Any, List[Any]], Any])->None:
+        """Split requests into chunks of `size` and send them on one resource, at most `concurrency` at a time.
+
+        If a chunk fails, the others are cancelled and awaited before the resource closes and the error is raised."""
+        if not requests:
+            return
+        semaphore = Semaphore(concurrency)
+        async with (await CREDENTIALS.session()).resource("dynamodb", config=aws_config()) as dynamodb:
+            async def run(chunk:List[Any])->None:
+                async with semaphore:
+                    await send(dynamodb, chunk)
+            loop = get_running_loop()
+            tasks = [loop.create_task(run(requests[start:start+size])) for start in range(0, len(requests), size)]
+            try:
+                await gather(*tasks)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                await gather(*tasks, return_exceptions=True)
+                raise
+
+    @classmethod
+    async def batch_get(cls, keys:Iterable[Union["DynaModel",Dict[str,Any]]], concurrency:int=4)->List[Dict[str,Any]]:
+        """Fetch many items by primary key, 100 per request; missing items are left out and order is not kept."""
+        table = cls.__name__.lower()+"s"
+        unique = list({tuple(key.values()): key for key in map(cls._key, keys)}.values())
+        items: List[Dict[str,Any]] = []
+        async def send(dynamodb:Any, chunk:List[Dict[str,Any]])->None:
+            for response in await cls._until_processed(dynamodb.batch_get_item, {table: {"Keys": chunk}}, "UnprocessedKeys"):
+                items.extend(response["Responses"].get(table, []))
+        await cls._run_batches(unique, BATCH_GET_SIZE, concurrency, send)
+        return items
+
+    @classmethod
+    async def _batch_write(cls, requests:Dict[Tuple[Any,...], Dict[str,Any]], concurrency:int)->None:
+        table = cls.__name__.lower()+"s"
+        async def send(dynamodb:Any, chunk:List[Dict[str,Any]])->None:
+            await cls._until_processed(dynamodb.batch_write_item, {table: chunk}, "UnprocessedItems")
+        await cls._run_batches(list(requests.values()), BATCH_WRITE_SIZE, concurrency, send)
+
+    @classmethod
+    async def batch_put(cls, items:Iterable["DynaModel"], concurrency:int=4)->None:
+        """Create or replace many items, 25 per request; the last of several items with the same key wins."""
+        requests = {}
+        for item in items:
+            data = item.dict()
+            requests[tuple(cls._key(data).values())] = {"PutRequest": {"Item": data}}
+        await cls._batch_write(requests, concurrency)
+
+    @classmethod
+    async def batch_delete(cls, keys:Iterable[Union["DynaModel",Dict[str,Any]]], concurrency:int=4)->None:
+        """Delete many items by primary key, 25 per request."""
+        requests = {tuple(key.values()): {"DeleteRequest": {"Key": key}} for key in map(cls._key, keys)}
+        await cls._batch_write(requests, concurrency)
+
+class RateLimiter:
+    """Schedules GitHub requests within the quota the API reports, instead of bursting into 403s.
+
+    A request whose turn would come after the invocation deadline fails fast with a 503 instead of waiting it out."""
+    def __init__(self, concurrency:int=4, reserve:int=100)->None:
+        self.concurrency = concurrency
+        self.reserve = reserve
+        self.in_flight = 0
+        self.queue:List[Tuple[int,int,Future]] = []
+        self.order = count()
+        self.remaining:Optional[int] = None
+        self.reset_at = 0.0
+        self.blocked_until = 0.0
+        self.next_slot = 0.0
+        self.stats:Dict[str,float] = {"requests": 0, "limited": 0, "rejected": 0, "max_queue_depth": 0, "total_wait": 0.0, "max_wait": 0.0}
+
+    def interval(self, now:float)->float:
+        """Seconds between requests once the remaining quota drops below `reserve`, so it lasts until the reset."""
+        if self.remaining is None or self.remaining >= self.reserve or self.reset_at <= now:
+            return 0.0
+        return (self.reset_at - now) / max(self.remaining, 1)
+
+    def rejected(self, start_at:float)->HTTPException:
+        """The error for a request that cannot start before the invocation deadline."""
+        self.stats["rejected"] += 1
+        retry_after = max(int(start_at - time()) + 1, 1)
+        return HTTPException(status_code=503, detail="GitHub rate limit", headers={"Retry-After": str(retry_after)})
+
+    async def acquire(self, priority:int=0)->None:
+        """Wait for a free slot, lower `priority` values first, then for the request's turn under the quota."""
+        started = time()
+        deadline = DEADLINE.get()
+        if self.in_flight >= self.concurrency or self.queue:
+            waiter = get_running_loop().create_future()
+            heappush(self.queue, (priority, next(self.order), waiter))
+            self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], len(self.queue))
+            try:
+                await wait_for(waiter, None if deadline is None else max(deadline - time(), 0.0))
+            except (CancelledError, WaitTimeout) as exception:
+                if waiter.done() and not waiter.cancelled():
+                    self.release()
+                if isinstance(exception, CancelledError):
+                    raise
+                raise self.rejected(max(self.next_slot, self.blocked_until)) from None
+        else:
+            self.in_flight += 1
+        now = time()
+        start_at = max(now, self.next_slot, self.blocked_until)
+        if deadline is not None and start_at >= deadline:
+            self.release()
+            raise self.rejected(start_at)
+        self.next_slot = start_at + self.interval(now)
+        if start_at > now:
+            try:
+                await sleep(start_at - now)
+            except BaseException:
+                # The slot is already held; hand it on, since the caller's release never runs.
+                self.release()
+                raise
+        waited = time() - started
+        self.stats["requests"] += 1
+        self.stats["total_wait"] += waited
+        self.stats["max_wait"] = max(self.stats["max_wait"], waited)
+
+    def release(self)->None:
+        """Hand the slot to the next queued request, if any."""
+        while self.queue:
+            waiter = heappop(self.queue)[2]
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def update(self, status:int, headers:Any)->bool:
+        """Record the quota from a response; returns whether it was rejected by a rate limit."""
+        now = time()
+        if "X-RateLimit-Remaining" in headers:
+            self.remaining = int(headers["X-RateLimit-Remaining"])
+        if "X-RateLimit-Reset" in headers:
+            self.reset_at = float(headers["X-RateLimit-Reset"])
+        if status not in (403, 429) or ("Retry-After" not in headers and self.remaining != 0):
+            return False
+        self.stats["limited"] += 1
+        retry_after = self.retry_after(headers["Retry-After"], now) if "Retry-After" in headers else None
+        if retry_after is not None:
+            self.blocked_until = max(self.blocked_until, now + retry_after)
+        else:
+            self.blocked_until = max(self.blocked_until, self.reset_at)
+        return True
+
+    @staticmethod
+    def retry_after(value:str, now:float)->Optional[float]:
+        """Seconds to wait from a Retry-After header, given either as seconds or as an HTTP date."""
+        try:
+            return float(value)
+        except ValueError:
+            pass
+        try:
+            return parsedate_to_datetime(value).timestamp() - now
+        except (TypeError, ValueError):
+            return None
+
+    def metrics(self)->Dict[str,float]:
+        """Queue depth, wait times and the last known quota."""
+        requests = self.stats["requests"]
+        return {
+            **self.stats,
+            "queue_depth": len(self.queue),
+            "in_flight": self.in_flight,
+            "mean_wait": self.stats["total_wait"] / requests if requests else 0.0,
+            "remaining": -1 if self.remaining is None else self.remaining,
+            "reset_in": max(self.reset_at - time(), 0.0)}
+
+class CachedPage(BaseModel):
+    """A cached GitHub response and the validators to revalidate it with."""
+    body:bytes
+    validators:Dict[str,str]
+    next_url:Optional[str] = None
+
 class APIClient:
     """API Client"""
     base_url:Union[str, AnyHttpUrl] = "https://api.github.com/"
     headers:Dict[str,str] = {"Authorization": f"token {environ.get('API_TOKEN')}"}
 
-    async def get(self, endpoint:str) -> Dict[str,Any]:
+    def __init__(self, http:Optional[HTTPClient]=None, max_cache_bytes:int=4*1024*1024, limiter:Optional[RateLimiter]=None, max_retries:int=2)->None:
+        self.http = http or HTTPClient()
+        self.limiter = limiter or RateLimiter()
+        self.max_retries = max_retries
+        self.max_cache_bytes = max_cache_bytes
+        self.cache:"OrderedDict[str, CachedPage]" = OrderedDict()
+        self.cache_bytes = 0
+
+    def _cache_put(self, url:str, page:CachedPage)->None:
+        """Store a page, evicting the least recently used ones to stay within `max_cache_bytes`."""
+        self._cache_pop(url)
+        if len(page.body) > self.max_cache_bytes:
+            return
+        self.cache[url] = page
+        self.cache_bytes += len(page.body)
+        while self.cache_bytes > self.max_cache_bytes:
+            self._cache_pop(next(iter(self.cache)))
+
+    def _cache_pop(self, url:str)->None:
+        page = self.cache.pop(url, None)
+        if page is not None:
+            self.cache_bytes -= len(page.body)
+
+    async def request(self, method:str, url:str, priority:int=0, **kwargs:Any)->Tuple[ClientResponse,bytes]:
+        """Send a request through the rate limiter, retrying once the limit it hit has passed; returns the released response and its body."""
+        headers = kwargs.pop("headers", self.headers)
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.acquire(priority)
+            try:
+                async with self.http.session.request(method, url, headers=headers, timeout=client_timeout(), **kwargs) as response:
+                    body = await response.read()
+                    limited = self.limiter.update(response.status, response.headers)
+            finally:
+                self.limiter.release()
+            if not limited or attempt == self.max_retries:
+                break
+        return response, body
+
+    async def fetch(self, url:str, priority:int=0)->CachedPage:
+        """GET a URL, revalidating a cached copy with `If-None-Match`/`If-Modified-Since`; a 304 is served from the cache and does not count against the rate limit."""
+        cached = self.cache.get(url)
+        headers = dict(self.headers)
+        if cached is not None:
+            headers.update(cached.validators)
+        response, body = await self.request("GET", url, priority, headers=headers)
+        if response.status == 304 and cached is not None:
+            self.cache.move_to_end(url)
+            return cached
+        next_link = response.links.get("next")
+        page = CachedPage(
+            body=body,
+            validators={},
+            next_url=str(next_link["url"]) if next_link else None)
+        if response.status == 200:
+            if "ETag" in response.headers:
+                page.validators["If-None-Match"] = response.headers["ETag"]
+            if "Last-Modified" in response.headers:
+                page.validators["If-Modified-Since"] = response.headers["Last-Modified"]
+        if page.validators:
+            self._cache_put(url, page)
+        else:
+            self._cache_pop(url)
+        return page
+
+    async def get(self, endpoint:str, priority:int=0) -> Dict[str,Any]:
         """Get Method override"""
-        async with ClientSession() as session:
-            async with session.get(self.base_url+endpoint, headers=self.headers) as response:
-                return await response.json()
-            
+        return loads((await self.fetch(self.base_url+endpoint, priority)).body)
+
+    async def pages(self, endpoint:str, priority:int=0) -> AsyncIterator[Any]:
+        """Yield every page of a paginated endpoint, following `Link: rel="next"` and fetching the next page while the caller works on the current one.
+
+        Prefetches are queued one priority level lower, so they never hold up a request someone is waiting on."""
+        pending:Optional[Task] = get_running_loop().create_task(self.fetch(self.base_url+endpoint, priority))
+        try:
+            while pending is not None:
+                page = await pending
+                pending = get_running_loop().create_task(self.fetch(page.next_url, priority + 1)) if page.next_url else None
+                yield loads(page.body)
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    async def items(self, endpoint:str, priority:int=0) -> AsyncIterator[Any]:
+        """Yield the items of every page of a paginated list endpoint."""
+        async for page in self.pages(endpoint, priority):
+            for item in page:
+                yield item
+
     async def post(self, endpoint:str, data:Dict[str,Any]) -> Dict[str,Any]:
         """Post Method override"""
-        async with ClientSession() as session:
-            async with session.post(self.base_url+endpoint, headers=self.headers, json=data) as response:
-                return await response.json()
+        self._cache_pop(self.base_url+endpoint)
+        _, body = await self.request("POST", self.base_url+endpoint, json=data)
+        return loads(body)
             
     async def patch(self, endpoint:str, data:Dict[str,Any]) -> Dict[str,Any]:
         """Patch Method override"""
-        async with ClientSession() as session:
-            async with session.patch(self.base_url+endpoint, headers=self.headers, json=data) as response:
-                return await response.json()
+        self._cache_pop(self.base_url+endpoint)
+        _, body = await self.request("PATCH", self.base_url+endpoint, json=data)
+        return loads(body)
             
     async def delete(self, endpoint:str) -> Dict[str,Any]:
         """Delete Method override"""
-        async with ClientSession() as session:
-            async with session.delete(self.base_url+endpoint, headers=self.headers) as response:
-                return await response.json()
+        self._cache_pop(self.base_url+endpoint)
+        _, body = await self.request("DELETE", self.base_url+endpoint)
+        return loads(body)
             
-    async def text(self, endpoint:str) -> str:
+    async def text(self, endpoint:str, priority:int=0) -> str:
         """Get text"""
-        async with ClientSession() as session:
-            async with session.get(self.base_url+endpoint, headers=self.headers) as response:
-                return await response.text(encoding="utf-8")
+        return (await self.fetch(self.base_url+endpoint, priority)).body.decode("utf-8")
 
 class App(FastAPI):
     """Main App"""
+    @cached_property
+    def templates(self)->"Jinja2Templates":
+        """Jinja2 templates, loaded on first use."""
+        from fastapi.templating import Jinja2Templates
+        return Jinja2Templates(directory="templates")
+
+    @cached_property
+    def session(self)->"Session":
+        """aioboto3 session, created on first use."""
+        from aioboto3 import Session
+        return Session(
+            aws_access_key_id=environ.get("AWS_ACCESS_KEY_ID"),
+            aws_secret_access_key=environ.get("AWS_SECRET_ACCESS_KEY"),
+            region_name=environ.get("AWS_DEFAULT_REGION"))
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.title = "Serverless FastAPI"
         self.description = "A serverless implementation of FastAPI framework on top of AWS Lambda"
         self.version = "0.1.0"
         self.fetch = HTTPClient()
-        self.templates = Jinja2Templates(directory="templates")
-        self.session = Session(
-            aws_access_key_id=environ.get("AWS_ACCESS_KEY_ID"),
-            aws_secret_access_key=environ.get("AWS_SECRET_ACCESS_KEY"),
-            region_name=environ.get("AWS_DEFAULT_REGION"))
+        self.add_middleware(DeadlineMiddleware)
+        self.add_event_handler("shutdown", self.fetch.close)
+
+        @self.get("/api/health/http")
+        async def http_pool_stats()->Dict[str,int]:
+            """Reused and newly opened outbound connections since the container started."""
+            return self.fetch.stats
         
         @self.get("/api/search/pip/{pkg}/{page}")
-        async def pip_search(pkg:str, page:int=1):
+        async def pip_search(http_response: Response, pkg:str, page:int=1):
             """Search for a package on PyPI"""
             try:    
                 url = PYPI_URL + pkg + "&page=" + str(page)
@@ -312,20 +847,23 @@ class App(FastAPI):
                 descriptions = [description.text for description in response.find_all("p", class_ = "package-snippet__description")]
                 data= [{"name":p, "version":v, "description":d} for  p,v,d in zip(packages,versions,descriptions)]
                 print(data)
+                http_response.headers.update(CACHE_CONTROL)
                 return data
             except Exception as e:
                 print(e)
                 return {"error":str(e)}
             
         @self.get("/api/search/{lang}/{query}/{page}")
-        async def google_search(lang:str, query:str, page:int)->List[Dict[str,Any]]:
+        async def google_search(http_response: Response, lang:str, query:str, page:int)->List[Dict[str,Any]]:
                 """Search for a query on Google"""
                 try:
                     response = await self.fetch.html(url=f"https://www.google.com/search?q={query}&lr=lang_{lang}&start={str(page*10)}")
-                    urls = [link.find("a")["href"] for link in BeautifulSoup(response, "html.parser").find_all("div", class_="yuRUbf")]
-                    summaries = [link.find("h3").text for link in BeautifulSoup(response, "html.parser").find_all("div", class_="yuRUbf")]   
+                    results = parse_html(response).find_all("div", class_="yuRUbf")
+                    urls = [link.find("a")["href"] for link in results]
+                    summaries = [link.find("h3").text for link in results]
                     response = [{"url":i, "summary":j} for i,j in zip(urls, summaries)]
                     print(response)
+                    http_response.headers.update(CACHE_CONTROL)
                     return response
                 except Exception as exception:
                     print(exception)
@@ -370,7 +908,7 @@ class App(FastAPI):
 
         @self.get("/api/html")
         async def html():
-            return self.templates.TemplateResponse("index.html", {"request": {}})
+            return self.templates.TemplateResponse("index.html", {"request": {}}, headers=CACHE_CONTROL)
 
         @self.get("/api/python")
         async def python():
@@ -378,12 +916,12 @@ class App(FastAPI):
 
         @self.get("/api/lib")
         async def html_lib():
-            return self.templates.TemplateResponse("lib.html", {"request": {}})
+            return self.templates.TemplateResponse("lib.html", {"request": {}}, headers=CACHE_CONTROL)
 
         @self.post("/api/function")
         async def lambda_endpoint(user=Depends(self.fetch.auth), file:UploadFile=File(...))->Union[HttpUrl,str]:
             zip_file = await file.read()
-            async with self.session.client("lambda") as lambda_:
+            async with self.session.client("lambda", config=aws_config()) as lambda_:
                 response = await lambda_.create_function(
                     FunctionName=user.sub,
                     Runtime="python3.8",
@@ -419,7 +957,7 @@ class App(FastAPI):
 
         @self.post("/api/website")
         async def website_endpoint(website:WebSite, user=Depends(self.fetch.auth))->Union[HttpUrl,str]:
-            async with self.session.client("s3") as s3:
+            async with self.session.client("s3", config=aws_config()) as s3:
                 sub = user['sub']
                 response = await s3.put_object(
                     Bucket=AWS_S3_BUCKET,
@@ -433,12 +971,12 @@ class App(FastAPI):
 
         @self.post("/api/upload/{key}")
         async def upload(key:str,file:UploadFile = File(...))->None:
-            async with self.session.client("s3") as client:
+            async with self.session.client("s3", config=aws_config()) as client:
                 await client.put_object(Body=file.file.read(), Bucket=AWS_S3_BUCKET, Key=f"{key}/{file.filename}", ACL="public-read", ContentType=file.content_type)
 
         @self.get("/api/upload")
         async def list_uploads(user=Depends(self.fetch.auth)):
-            async with self.session.client("s3") as client:
+            async with self.session.client("s3", config=aws_config()) as client:
                 response = await client.list_objects_v2(Bucket=AWS_S3_BUCKET, Prefix=user["sub"])
                 response.pop("ResponseMetadata")
                 data = [f"https://{AWS_S3_BUCKET}.s3.amazonaws.com/{item['Key']}" for item in response["Contents"] if len(response["Contents"]) > 0] if response.get("Contents") else []
@@ -446,7 +984,7 @@ class App(FastAPI):
                 
         @self.delete("/api/upload")
         async def delete_upload(url:str, user=Depends(self.fetch.auth)):
-            async with self.session.client("s3") as client:
+            async with self.session.client("s3", config=aws_config()) as client:
                 try:
                     await client.delete_object(Bucket=AWS_S3_BUCKET, Key=url.split(f"https://{AWS_S3_BUCKET}.s3.amazonaws.com/")[1])
                 except Exception as exception:
@@ -454,7 +992,7 @@ class App(FastAPI):
 
         @self.get("/api/email")
         async def send_email_endpoint(email:EmailStr, subject:str, message:str)->bool:
-            async with self.session.client("ses") as client:
+            async with self.session.client("ses", config=aws_config()) as client:
                 try:
                     await client.send_email(
                         Source=AWS_SES_EMAIL,
@@ -478,7 +1016,7 @@ class App(FastAPI):
     
         @self.get("/api/chat")
         async def chatbot(message:str)->str:
-            async with self.session.client("comprehend") as client:
+            async with self.session.client("comprehend", config=aws_config()) as client:
                 entities = await client.detect_entities(Text=message, LanguageCode="en")
                 entities.pop("ResponseMetadata")
                 sentiments = await client.detect_sentiment(Text=message, LanguageCode="en")
@@ -496,7 +1034,7 @@ class App(FastAPI):
             
         @self.get("/api/translate/{source}/{target}/{text}")
         async def translate_endpoint(source:str, target:str, text:str)->str:
-            async with self.session.client("translate") as client:
+            async with self.session.client("translate", config=aws_config()) as client:
                 try:
                     response = await client.translate_text(Text=text, SourceLanguageCode=source, TargetLanguageCode=target)
                     return response["TranslatedText"]
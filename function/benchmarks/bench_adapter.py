@@ -0,0 +1,238 @@
+"""Throughput and allocations for each stage of the adapter hot path.
+
+Stages are timed separately for every event in the corpus:
+
+* **infer** - `Mangum.infer`.
+* **scope** - building the handler scope and decoding the request body.
+* **app** - running `HTTPCycle` against the ASGI application.
+* **serialize** - converting the ASGI response into the Lambda response shape.
+* **total** - a complete `Mangum.__call__`.
+
+Results are written as a single JSON document with a stable key order so runs can
+be diffed or compared by CI. Run from the `function` directory:
+
+    python -m benchmarks.bench_adapter --app trivial --output results.json
+
+`--app function` benchmarks `App` from `app.py` with outbound HTTP stubbed out; it
+needs the function's requirements installed. Allocation figures need Python 3.9+.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, List
+
+from mangum import Mangum
+from mangum.protocols import HTTPCycle
+
+from benchmarks.events import SOURCES, corpus
+
+STAGES = ("infer", "scope", "app", "serialize", "total")
+
+
+class Context:
+    function_name = "benchmark"
+    aws_request_id = "00000000-0000-0000-0000-000000000000"
+
+    def get_remaining_time_in_millis(self) -> int:
+        return 30_000
+
+
+async def trivial_app(scope, receive, send) -> None:
+    if scope["type"] != "http":
+        return
+
+    size = 0
+    more_body = True
+    while more_body:
+        message = await receive()
+        size += len(message.get("body", b""))
+        more_body = message.get("more_body", False)
+
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                [b"content-type", b"application/json"],
+                [b"set-cookie", b"session=abc; Path=/"],
+                [b"set-cookie", b"theme=dark; Path=/"],
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": b'{"received": %d}' % size})
+
+
+PYPI_HTML = "".join(
+    '<span class="package-snippet__name">pkg%d</span>'
+    '<span class="package-snippet__version">1.0.%d</span>'
+    '<p class="package-snippet__description">Package number %d</p>' % (i, i, i)
+    for i in range(20)
+)
+
+
+def function_app() -> Any:
+    """`App` from `app.py` with every outbound HTTP call answered from memory."""
+    from bs4 import BeautifulSoup
+
+    import app as module
+
+    application = module.App()
+
+    async def html(url: str, *args: Any, **kwargs: Any) -> str:
+        return PYPI_HTML
+
+    async def soup(url: str, *args: Any, **kwargs: Any) -> Any:
+        return BeautifulSoup(PYPI_HTML, "html.parser")
+
+    async def json_(url: str, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        return {"sub": "auth0|benchmark"}
+
+    application.fetch.html = application.fetch.text = html
+    application.fetch.soup = soup
+    application.fetch.json = json_
+    return application
+
+
+def workloads(app_name: str) -> Dict[str, Dict[str, Any]]:
+    if app_name == "trivial":
+        return corpus("/api")
+
+    # The function app is exercised with GET routes only: one without I/O and one
+    # that scrapes (stubbed) HTML.
+    return {
+        f"{source}{path}": builder(path)
+        for source, builder in SOURCES.items()
+        for path in ("/api", "/api/search/pip/fastapi/1")
+    }
+
+
+class Timer:
+    """Measures the wall time of a stage in nanoseconds."""
+
+    def start(self) -> None:
+        self.started = time.perf_counter_ns()
+
+    def stop(self) -> int:
+        return time.perf_counter_ns() - self.started
+
+
+class AllocationTracker:
+    """Measures the peak memory allocated during a stage, in bytes."""
+
+    def start(self) -> None:
+        tracemalloc.reset_peak()
+        self.baseline, _ = tracemalloc.get_traced_memory()
+
+    def stop(self) -> int:
+        _, peak = tracemalloc.get_traced_memory()
+        return peak - self.baseline
+
+
+def run_stages(
+    adapter: Mangum, event: Dict[str, Any], context: Context, probe: Any
+) -> Dict[str, int]:
+    """Runs one event through every stage, returning the cost of each stage."""
+    costs: Dict[str, int] = {}
+
+    probe.start()
+    handler = adapter.infer(event, context)
+    costs["infer"] = probe.stop()
+
+    probe.start()
+    scope = handler.scope
+    body = list(handler.iter_body(adapter.request_chunk_size))
+    costs["scope"] = probe.stop()
+
+    probe.start()
+    response = HTTPCycle(scope, body, adapter.loop)(adapter.app)
+    costs["app"] = probe.stop()
+
+    probe.start()
+    adapter.serialize(handler, response)
+    costs["serialize"] = probe.stop()
+
+    probe.start()
+    adapter(event, context)
+    costs["total"] = probe.stop()
+
+    return costs
+
+
+def benchmark(
+    adapter: Mangum, event: Dict[str, Any], iterations: int
+) -> Dict[str, Dict[str, float]]:
+    context = Context()
+    timer = Timer()
+    run_stages(adapter, event, context, timer)  # warm up
+
+    timings: Dict[str, List[int]] = {stage: [] for stage in STAGES}
+    for _ in range(iterations):
+        for stage, cost in run_stages(adapter, event, context, timer).items():
+            timings[stage].append(cost)
+
+    allocations: Dict[str, int] = dict.fromkeys(STAGES, 0)
+    if hasattr(tracemalloc, "reset_peak"):
+        samples = max(1, min(iterations, 20))
+        tracker = AllocationTracker()
+        tracemalloc.start()
+        try:
+            for _ in range(samples):
+                for stage, peak in run_stages(adapter, event, context, tracker).items():
+                    allocations[stage] = max(allocations[stage], peak)
+        finally:
+            tracemalloc.stop()
+
+    results: Dict[str, Dict[str, float]] = {}
+    for stage in STAGES:
+        ordered = sorted(timings[stage])
+        median = ordered[len(ordered) // 2]
+        results[stage] = {
+            "median_ns": median,
+            "p90_ns": ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))],
+            "ops_per_sec": round(1e9 / median, 1) if median else 0.0,
+            "peak_alloc_bytes": allocations[stage],
+        }
+    return results
+
+
+def main(argv: List[str] = sys.argv[1:]) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app", choices=("trivial", "function"), default="trivial")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--filter", default="", help="only events containing this")
+    parser.add_argument("--output", default="-", help="file path, or - for stdout")
+    args = parser.parse_args(argv)
+
+    app = trivial_app if args.app == "trivial" else function_app()
+    adapter = Mangum(app, lifespan="off")
+
+    results: List[Dict[str, Any]] = []
+    for name, event in sorted(workloads(args.app).items()):
+        if args.filter not in name:
+            continue
+        for stage, figures in benchmark(adapter, event, args.iterations).items():
+            results.append({"app": args.app, "event": name, "stage": stage, **figures})
+
+    document: Dict[str, Any] = {
+        "schema": 1,
+        "environment": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+        },
+        "iterations": args.iterations,
+        "results": results,
+    }
+    output = json.dumps(document, indent=2, sort_keys=True)
+    if args.output == "-":
+        print(output)
+    else:
+        with open(args.output, "w") as fp:
+            fp.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Response header serialization: the shared single-pass engine against the previous
+per-handler functions.
+
+Run from the `function` directory: python -m benchmarks.bench_headers
+"""
+import timeit
+from typing import Dict, List, Tuple
+
+from mangum.handlers.utils import (
+    combine_headers_v2,
+    edge_headers,
+    handle_multi_value_headers,
+)
+from mangum.types import Headers
+
+
+# A typical Starlette JSON response, and one that also sets several cookies.
+RESPONSES: Dict[str, Headers] = {
+    "json": [
+        [b"content-length", b"1024"],
+        [b"content-type", b"application/json"],
+    ],
+    "cookies": [
+        [b"content-length", b"1024"],
+        [b"content-type", b"text/html; charset=utf-8"],
+        [b"cache-control", b"no-cache"],
+        [b"vary", b"Accept-Encoding"],
+        [b"set-cookie", b"session=abc; Path=/; HttpOnly"],
+        [b"set-cookie", b"theme=dark; Path=/"],
+        [b"set-cookie", b"lang=en; Path=/"],
+    ],
+}
+
+
+def legacy_multi_value_headers(
+    response_headers: Headers,
+) -> Tuple[Dict[str, str], Dict[str, List[str]]]:
+    headers: Dict[str, str] = {}
+    multi_value_headers: Dict[str, List[str]] = {}
+    for key, value in response_headers:
+        lower_key = key.decode().lower()
+        if lower_key in multi_value_headers:
+            multi_value_headers[lower_key].append(value.decode())
+        elif lower_key in headers:
+            multi_value_headers[lower_key] = [headers[lower_key], value.decode()]
+            del headers[lower_key]
+        else:
+            headers[lower_key] = value.decode()
+    return headers, multi_value_headers
+
+
+def legacy_combine_headers_v2(
+    input_headers: Headers,
+) -> Tuple[Dict[str, str], List[str]]:
+    output_headers: Dict[str, str] = {}
+    cookies: List[str] = []
+    for key, value in input_headers:
+        normalized_key: str = key.decode().lower()
+        normalized_value: str = value.decode()
+        if normalized_key == "set-cookie":
+            cookies.append(normalized_value)
+        else:
+            if normalized_key in output_headers:
+                previous = output_headers[normalized_key]
+                normalized_value = f"{previous},{normalized_value}"
+            output_headers[normalized_key] = normalized_value
+    return output_headers, cookies
+
+
+def legacy_edge_headers(response_headers: Headers) -> Dict[str, List[Dict[str, str]]]:
+    legacy_multi_value_headers(response_headers)
+    return {
+        key.decode().lower(): [{"key": key.decode().lower(), "value": val.decode()}]
+        for key, val in response_headers
+    }
+
+
+CASES = {
+    "v1": (
+        legacy_multi_value_headers,
+        handle_multi_value_headers,
+    ),
+    "v2": (
+        legacy_combine_headers_v2,
+        combine_headers_v2,
+    ),
+    "edge": (
+        legacy_edge_headers,
+        lambda headers: edge_headers(*handle_multi_value_headers(headers)),
+    ),
+}
+
+
+def best_ns(func, number: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e9
+
+
+def main(number: int = 50_000) -> None:
+    print(
+        f"{'shape':<8}{'response':<10}"
+        f"{'legacy (ns)':>13}{'shared (ns)':>13}{'saving':>9}"
+    )
+    for shape, (legacy, shared) in CASES.items():
+        for name, headers in RESPONSES.items():
+            legacy_ns = best_ns(lambda: legacy(headers), number)
+            shared_ns = best_ns(lambda: shared(headers), number)
+            print(
+                f"{shape:<8}{name:<10}{legacy_ns:>13.0f}{shared_ns:>13.0f}"
+                f"{(legacy_ns - shared_ns) / legacy_ns:>9.0%}"
+            )
+
+
+if __name__ == "__main__":
+    main()
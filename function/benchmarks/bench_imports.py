@@ -0,0 +1,91 @@
+"""Import-time cost of a module, broken down per imported module and per package.
+
+Runs a fresh interpreter with `-X importtime` so nothing is cached, then aggregates
+the report. Run from the `function` directory:
+
+    python -m benchmarks.bench_imports app --top 25
+    python -m benchmarks.bench_imports app --json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+ImportTiming = Tuple[str, int, int]
+
+
+def profile(module: str) -> List[ImportTiming]:
+    """Returns `(module, self_us, cumulative_us)` for every import made by `module`."""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    if completed.returncode != 0:
+        raise SystemExit(completed.stderr)
+
+    timings: List[ImportTiming] = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|", 2)
+        timings.append((name.strip(), int(self_us), int(cumulative_us)))
+    return timings
+
+
+def by_package(timings: List[ImportTiming]) -> Dict[str, int]:
+    totals: Dict[str, int] = defaultdict(int)
+    for name, self_us, _ in timings:
+        totals[name.split(".")[0]] += self_us
+    return dict(totals)
+
+
+def main(argv: List[str] = sys.argv[1:]) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("module", nargs="?", default="app")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    timings = profile(args.module)
+    packages = sorted(by_package(timings).items(), key=lambda item: -item[1])
+    modules = sorted(timings, key=lambda item: -item[1])
+    total_us = sum(self_us for _, self_us, _ in timings)
+
+    if args.json:
+        print(
+            json.dumps(
+                {
+                    "module": args.module,
+                    "total_us": total_us,
+                    "packages": [
+                        {"package": name, "self_us": self_us}
+                        for name, self_us in packages
+                    ],
+                    "modules": [
+                        {"module": name, "self_us": self_us, "cumulative_us": cum_us}
+                        for name, self_us, cum_us in modules
+                    ],
+                },
+                indent=2,
+                sort_keys=True,
+            )
+        )
+        return
+
+    print(f"import {args.module}: {total_us / 1000:.1f} ms in {len(timings)} modules\n")
+    print(f"{'package':<32}{'self (ms)':>12}{'share':>8}")
+    for name, self_us in packages[: args.top]:
+        print(f"{name:<32}{self_us / 1000:>12.1f}{self_us / total_us:>8.1%}")
+    print(f"\n{'module':<48}{'self (ms)':>12}{'cumulative (ms)':>18}")
+    for name, self_us, cumulative_us in modules[: args.top]:
+        print(f"{name:<48}{self_us / 1000:>12.1f}{cumulative_us / 1000:>18.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Per-event cost of handler inference, with and without the event-shape cache.
+
+Run from the `function` directory: python -m benchmarks.bench_infer
+"""
+import timeit
+from itertools import chain
+
+from mangum import Mangum
+from mangum.adapter import HANDLERS
+
+from benchmarks.events import SOURCES
+
+
+async def app(scope, receive, send):  # pragma: no cover
+    pass
+
+
+def full_scan(handler: Mangum, event: dict) -> None:
+    for handler_cls in chain(handler.custom_handlers, HANDLERS):
+        if handler_cls.infer(event, None, handler.config):
+            handler_cls(event, None, handler.config)
+            break
+
+
+def best_ns(func, number: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e9
+
+
+def main(number: int = 100_000) -> None:
+    handler = Mangum(app, lifespan="off")
+    print(f"{'event':<18}{'scan (ns)':>12}{'cached (ns)':>14}{'saving':>10}")
+    for name, builder in SOURCES.items():
+        event = builder("/api")
+        scan_ns = best_ns(lambda: full_scan(handler, event), number)
+        cached_ns = best_ns(lambda: handler.infer(event, None), number)
+        print(
+            f"{name:<18}{scan_ns:>12.0f}{cached_ns:>14.0f}"
+            f"{(scan_ns - cached_ns) / scan_ns:>10.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
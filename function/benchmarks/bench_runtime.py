@@ -0,0 +1,72 @@
+"""Per-invocation overhead of the custom runtime.
+
+Compares awaiting `Mangum.invoke` directly with a full round trip through
+`mangum.runtime` and the fake Runtime API: fetching the event, decoding it,
+running the application and posting the response. Both sides share one event
+loop, so the figures are an upper bound on what the runtime adds. Run from the
+`function` directory:
+
+    python -m benchmarks.bench_runtime --iterations 2000 --concurrency 4
+"""
+import argparse
+import asyncio
+import time
+
+from mangum import Mangum
+from mangum.runtime import LambdaRuntime
+
+from benchmarks.bench_adapter import Context, trivial_app
+from benchmarks.events import http_api_v2
+from benchmarks.runtime_api import FakeRuntimeAPI
+
+
+async def bench_direct(adapter: Mangum, iterations: int) -> float:
+    event = http_api_v2("/api", "small")
+    context = Context()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await adapter.invoke(event, context)
+    return (time.perf_counter() - start) / iterations
+
+
+async def bench_runtime(adapter: Mangum, iterations: int, concurrency: int) -> float:
+    event = http_api_v2("/api", "small")
+    async with FakeRuntimeAPI() as api:
+        runtime = LambdaRuntime(adapter, concurrency, runtime_api=api.address)
+        serve_task = asyncio.ensure_future(runtime.serve())
+        await api.invoke(event)  # open the pooled connections
+
+        async def client() -> None:
+            for _ in range(iterations // concurrency):
+                kind, _ = await api.invoke(event)
+                assert kind == "response"
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+        serve_task.cancel()
+        runtime.client.close()
+    return elapsed / (iterations // concurrency * concurrency)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=1)
+    args = parser.parse_args()
+
+    adapter = Mangum(trivial_app, lifespan="off")
+    loop = adapter.loop
+    direct = loop.run_until_complete(bench_direct(adapter, args.iterations))
+    runtime = loop.run_until_complete(
+        bench_runtime(adapter, args.iterations, args.concurrency)
+    )
+    print(f"{'path':<24}{'per invocation (us)':>20}")
+    print(f"{'Mangum.invoke':<24}{direct * 1e6:>20.1f}")
+    print(f"{'runtime round trip':<24}{runtime * 1e6:>20.1f}")
+    print(f"{'runtime overhead':<24}{(runtime - direct) * 1e6:>20.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""Synthetic Lambda event corpus used by the benchmarks.
+
+Every builder returns a fresh event so benchmarks never share mutable state.
+"""
+import base64
+import json
+from typing import Any, Callable, Dict, Optional, Tuple
+
+HOST = "abcdefghij.execute-api.us-east-1.amazonaws.com"
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64; rv:78.0) Gecko/20100101 Firefox/78.0"
+
+BODIES: Dict[str, Tuple[bytes, str]] = {
+    "empty": (b"", ""),
+    "small": (json.dumps({"query": "fastapi", "page": 1}).encode(), "application/json"),
+    "large": (
+        b'{"items": [' + b'"lorem ipsum dolor sit amet",' * 36_000 + b'""]}',
+        "application/json",
+    ),
+    "binary": (bytes(range(256)) * 1024, "application/octet-stream"),
+}
+
+
+def _body(kind: str) -> Tuple[Optional[str], bool, str]:
+    data, content_type = BODIES[kind]
+    if not data:
+        return None, False, content_type
+    if content_type == "application/octet-stream":
+        return base64.b64encode(data).decode(), True, content_type
+    return data.decode(), False, content_type
+
+
+def _headers(content_type: str) -> Dict[str, str]:
+    return {
+        "accept": "application/json",
+        "accept-encoding": "gzip, deflate, br",
+        "content-type": content_type,
+        "host": HOST,
+        "user-agent": USER_AGENT,
+        "x-forwarded-for": "203.0.113.10",
+        "x-forwarded-port": "443",
+        "x-forwarded-proto": "https",
+    }
+
+
+def alb(path: str, body: str = "empty", multi_value: bool = False) -> Dict[str, Any]:
+    data, is_base64, content_type = _body(body)
+    event: Dict[str, Any] = {
+        "requestContext": {"elb": {"targetGroupArn": "arn:aws:elasticloadbalancing"}},
+        "httpMethod": "POST" if data else "GET",
+        "path": path,
+        "body": data or "",
+        "isBase64Encoded": is_base64,
+    }
+    headers = _headers(content_type)
+    if multi_value:
+        event["multiValueHeaders"] = {key: [value] for key, value in headers.items()}
+        event["multiValueHeaders"]["cookie"] = ["a=1", "b=2"]
+        event["multiValueQueryStringParameters"] = {"q": ["fastapi"], "tag": ["a", "b"]}
+    else:
+        event["headers"] = headers
+        event["queryStringParameters"] = {"q": "fastapi"}
+    return event
+
+
+def api_gateway_v1(path: str, body: str = "empty") -> Dict[str, Any]:
+    data, is_base64, content_type = _body(body)
+    headers = _headers(content_type)
+    return {
+        "resource": "/{proxy+}",
+        "path": path,
+        "httpMethod": "POST" if data else "GET",
+        "headers": headers,
+        "multiValueHeaders": {key: [value] for key, value in headers.items()},
+        "queryStringParameters": {"q": "fastapi"},
+        "multiValueQueryStringParameters": {"q": ["fastapi"]},
+        "requestContext": {
+            "resourcePath": "/{proxy+}",
+            "stage": "prod",
+            "identity": {"sourceIp": "203.0.113.10", "userAgent": USER_AGENT},
+        },
+        "body": data,
+        "isBase64Encoded": is_base64,
+    }
+
+
+def http_api_v2(path: str, body: str = "empty") -> Dict[str, Any]:
+    data, is_base64, content_type = _body(body)
+    method = "POST" if data else "GET"
+    return {
+        "version": "2.0",
+        "routeKey": "$default",
+        "rawPath": path,
+        "rawQueryString": "q=fastapi",
+        "cookies": ["a=1", "b=2"],
+        "headers": _headers(content_type),
+        "requestContext": {
+            "http": {
+                "method": method,
+                "path": path,
+                "protocol": "HTTP/1.1",
+                "sourceIp": "203.0.113.10",
+                "userAgent": USER_AGENT,
+            },
+            "stage": "$default",
+        },
+        "body": data,
+        "isBase64Encoded": is_base64,
+    }
+
+
+def lambda_at_edge(path: str, body: str = "empty") -> Dict[str, Any]:
+    data, is_base64, content_type = _body(body)
+    request: Dict[str, Any] = {
+        "clientIp": "203.0.113.10",
+        "headers": {
+            key: [{"key": key.title(), "value": value}]
+            for key, value in _headers(content_type).items()
+        },
+        "method": "POST" if data else "GET",
+        "querystring": "q=fastapi",
+        "uri": path,
+    }
+    if data:
+        request["body"] = {
+            "inputTruncated": False,
+            "action": "read-only",
+            "encoding": "base64" if is_base64 else "text",
+            "data": data,
+        }
+    return {
+        "Records": [
+            {"cf": {"config": {"eventType": "viewer-request"}, "request": request}}
+        ]
+    }
+
+
+EventBuilder = Callable[..., Dict[str, Any]]
+
+SOURCES: Dict[str, EventBuilder] = {
+    "alb": alb,
+    "alb_multi_value": lambda path, body="empty": alb(path, body, multi_value=True),
+    "api_gateway_v1": api_gateway_v1,
+    "http_api_v2": http_api_v2,
+    "lambda_at_edge": lambda_at_edge,
+}
+
+
+def corpus(path: str = "/api") -> Dict[str, Dict[str, Any]]:
+    """Every event source combined with every body size, keyed `source/body`."""
+    return {
+        f"{source}/{body}": builder(path, body)
+        for source, builder in SOURCES.items()
+        for body in BODIES
+    }
@@ -0,0 +1,115 @@
+"""A local fake of the Lambda Runtime API, for exercising `mangum.runtime` in tests
+and benchmarks without the managed runtime:
+
+    async with FakeRuntimeAPI() as api:
+        runtime = LambdaRuntime(adapter, runtime_api=api.address)
+        serve_task = asyncio.ensure_future(runtime.serve())
+        kind, payload = await api.invoke(event)
+
+`invoke` resolves to `("response", payload)` or `("error", payload)`, depending on
+which endpoint the runtime posted to.
+"""
+import asyncio
+import json
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from mangum.runtime import RUNTIME_API_VERSION
+
+PREFIX = f"/{RUNTIME_API_VERSION}/runtime"
+
+
+class FakeRuntimeAPI:
+    def __init__(self, host: str = "127.0.0.1", timeout_ms: int = 30_000) -> None:
+        self.host = host
+        self.timeout_ms = timeout_ms
+        self.address = ""
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.pending: "Optional[asyncio.Queue[Tuple[str, bytes]]]" = None
+        self.results: Dict[str, "asyncio.Future[Tuple[str, Any]]"] = {}
+        self.init_errors: List[dict] = []
+
+    async def __aenter__(self) -> "FakeRuntimeAPI":
+        self.pending = asyncio.Queue()
+        self.server = await asyncio.start_server(self.handle_connection, self.host, 0)
+        port = self.server.sockets[0].getsockname()[1]
+        self.address = f"{self.host}:{port}"
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        assert self.server is not None
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def invoke(self, event: Any) -> Tuple[str, Any]:
+        assert self.pending is not None
+        request_id = str(uuid.uuid4())
+        future = asyncio.get_event_loop().create_future()
+        self.results[request_id] = future
+        await self.pending.put((request_id, json.dumps(event).encode()))
+        return await future
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                content_length = 0
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    if name.strip().lower() == "content-length":
+                        content_length = int(value)
+                body = await reader.readexactly(content_length)
+
+                status, headers, response_body = await self.route(method, path, body)
+                head = [f"HTTP/1.1 {status} OK"]
+                head.append(f"Content-Length: {len(response_body)}")
+                head.extend(f"{name}: {value}" for name, value in headers.items())
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + response_body)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def route(
+        self, method: str, path: str, body: bytes
+    ) -> Tuple[int, Dict[str, str], bytes]:
+        if method == "GET" and path == f"{PREFIX}/invocation/next":
+            assert self.pending is not None
+            request_id, event = await self.pending.get()
+            deadline_ms = int(time.time() * 1000) + self.timeout_ms
+            return (
+                200,
+                {
+                    "Lambda-Runtime-Aws-Request-Id": request_id,
+                    "Lambda-Runtime-Deadline-Ms": str(deadline_ms),
+                    "Lambda-Runtime-Invoked-Function-Arn": (
+                        "arn:aws:lambda:local:000000000000:function:mangum"
+                    ),
+                    "Lambda-Runtime-Trace-Id": f"Root=1-{request_id[:8]}",
+                },
+                event,
+            )
+
+        if method == "POST" and path == f"{PREFIX}/init/error":
+            self.init_errors.append(json.loads(body))
+            return 202, {}, b'{"status": "OK"}'
+
+        parts = path.split("/")
+        if method == "POST" and parts[-1] in ("response", "error"):
+            future = self.results.pop(parts[-2], None)
+            if future is None:
+                return 400, {}, b'{"errorType": "InvalidRequestID"}'
+            future.set_result((parts[-1], json.loads(body)))
+            return 202, {}, b'{"status": "OK"}'
+
+        return 404, {}, b""
@@ -0,0 +1,17 @@
+"""Lambda entry point.
+
+Kept apart from `app`, which is also served with uvicorn from the repository root,
+where the vendored `mangum` package is not importable.
+"""
+from mangum import Mangum
+from mangum.cache import ResponseCache
+
+from app import app
+
+# The lifespan runs once per container, so the pooled HTTP session survives between
+# warm invocations. The deadline margin puts `aws.deadline` in the scope, which bounds
+# outbound calls and turns a timeout into a 504 rather than a killed invocation. Routes
+# that send `Cache-Control: public` are also served from the container's cache.
+handler = Mangum(
+    app, persistent_lifespan=True, deadline_margin=0.5, cache=ResponseCache()
+)
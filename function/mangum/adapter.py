@@ -1,10 +1,34 @@
+import asyncio
+import atexit
 import logging
+import signal
+import sys
+import threading
+import time
 from itertools import chain
-from contextlib import ExitStack
-from typing import List, Optional, Type
+from contextlib import ExitStack, contextmanager
+from types import FrameType
+from typing import (
+    Any,
+    Dict,
+    Hashable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
 
+from mangum.cache import CachedResponse, ResponseCache
+from mangum.batch import is_batch_event, load_batch_record, split_batch_event
+from mangum.compression import compress_response
+from mangum.metrics import InvocationMetrics, MetricsHook, PhaseTimer, emit
 from mangum.protocols import HTTPCycle, LifespanCycle
+from mangum.protocols.http import CANCEL_GRACE_PERIOD
 from mangum.handlers import ALB, HTTPGateway, APIGateway, LambdaAtEdge
+from mangum.handlers.utils import DEFAULT_TEXT_MIME_TYPES
 from mangum.exceptions import ConfigurationError
 from mangum.types import (
     ASGI,
@@ -13,6 +37,9 @@ from mangum.types import (
     LambdaEvent,
     LambdaContext,
     LambdaHandler,
+    LoopFactory,
+    Response,
+    ResponseWriter,
 )
 
 
@@ -26,6 +53,29 @@ HANDLERS: List[Type[LambdaHandler]] = [
     LambdaAtEdge,
 ]
 
+# Upper bound on distinct event shapes remembered by `Mangum.infer`.
+HANDLER_CACHE_SIZE = 64
+
+
+def event_fingerprint(event: LambdaEvent) -> Hashable:
+    """The shape of an event: its top-level keys, in any order, and its version."""
+    return frozenset(event), event.get("version")
+
+
+def batch_response(results: List[Tuple[str, Optional[dict]]]) -> dict:
+    return {
+        "batchItemFailures": [
+            {"itemIdentifier": item_id}
+            for item_id, response in results
+            if response is None
+            or response.get("statusCode", response.get("status", 500)) >= 500
+        ],
+        "responses": [
+            {"itemIdentifier": item_id, "response": response}
+            for item_id, response in results
+        ],
+    }
+
 
 class Mangum:
     def __init__(
@@ -34,22 +84,102 @@ class Mangum:
         lifespan: LifespanMode = "auto",
         api_gateway_base_path: str = "/",
         custom_handlers: Optional[List[Type[LambdaHandler]]] = None,
+        persistent_lifespan: bool = False,
+        loop_factory: Optional[LoopFactory] = None,
+        text_mime_types: Optional[List[str]] = None,
+        compression: bool = False,
+        compression_threshold: int = 1024,
+        batch_concurrency: int = 10,
+        request_chunk_size: int = 64 * 1024,
+        metrics_hooks: Optional[List[MetricsHook]] = None,
+        cache: Optional[ResponseCache] = None,
+        deadline_margin: Optional[float] = None,
+        background_budget: Optional[float] = None,
     ) -> None:
         if lifespan not in ("auto", "on", "off"):
             raise ConfigurationError(
                 "Invalid argument supplied for `lifespan`. Choices are: auto|on|off"
             )
+        if batch_concurrency < 1:
+            raise ConfigurationError(
+                "Invalid argument supplied for `batch_concurrency`. Must be at least 1."
+            )
+        if background_budget is not None and background_budget < 0:
+            raise ConfigurationError(
+                "Invalid argument supplied for `background_budget`. Must not be "
+                "negative."
+            )
+        if (
+            background_budget is not None
+            and lifespan in ("auto", "on")
+            and not persistent_lifespan
+        ):
+            # A per-invocation lifespan would shut down before deferred work ends,
+            # or make every response wait for it.
+            raise ConfigurationError(
+                "`background_budget` requires `persistent_lifespan=True` or "
+                "`lifespan='off'`."
+            )
 
         self.app = app
         self.lifespan = lifespan
         self.api_gateway_base_path = api_gateway_base_path or "/"
-        self.config = LambdaConfig(api_gateway_base_path=self.api_gateway_base_path)
+        self.text_mime_types = tuple(text_mime_types or DEFAULT_TEXT_MIME_TYPES)
+        self.config = LambdaConfig(
+            api_gateway_base_path=self.api_gateway_base_path,
+            text_mime_types=self.text_mime_types,
+        )
         self.custom_handlers = custom_handlers or []
+        self.persistent_lifespan = persistent_lifespan
+        self.lifespan_cycle: Optional[LifespanCycle] = None
+        self.loop_factory = loop_factory or asyncio.new_event_loop
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.compression = compression
+        self.compression_threshold = compression_threshold
+        self.batch_concurrency = batch_concurrency
+        self.request_chunk_size = request_chunk_size
+        self.metrics_hooks = metrics_hooks or []
+        self.cache = cache
+        self.deadline_margin = deadline_margin
+        self.background_budget = background_budget
+        self.background: Set[asyncio.Task] = set()
+        if background_budget is not None:
+            atexit.register(self.finish_background)
+        self.cold_start = True
+        self.handler_cache: Dict[Hashable, Type[LambdaHandler]] = {}
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The event loop owned by this adapter, created on first use.
+
+        The same loop drives every invocation in the container, so tasks and
+        connections opened by the application survive between warm invocations.
+        """
+        if self._loop is None or self._loop.is_closed():
+            self._loop = self.loop_factory()
+            asyncio.set_event_loop(self._loop)
+
+        return self._loop
 
     def infer(self, event: LambdaEvent, context: LambdaContext) -> LambdaHandler:
-        for handler_cls in chain(self.custom_handlers, HANDLERS):
+        handlers = chain(self.custom_handlers, HANDLERS)
+        # Checking the first handler is cheaper than fingerprinting the event, so
+        # the cache only serves events that would otherwise scan further.
+        first_cls = next(handlers)
+        if first_cls.infer(event, context, self.config):
+            return first_cls(event, context, self.config)
+
+        fingerprint = event_fingerprint(event)
+        cached_cls = self.handler_cache.get(fingerprint)
+        if cached_cls is not None:
+            return cached_cls(event, context, self.config)
+
+        for handler_cls in handlers:
             if handler_cls.infer(event, context, self.config):
                 handler = handler_cls(event, context, self.config)
+                if len(self.handler_cache) >= HANDLER_CACHE_SIZE:
+                    self.handler_cache.clear()
+                self.handler_cache[fingerprint] = handler_cls
                 break
         else:
             raise RuntimeError(  # pragma: no cover
@@ -61,16 +191,324 @@ class Mangum:
 
         return handler
 
+    def startup(self) -> LifespanCycle:
+        """Runs application startup once and keeps the lifespan connection open.
+
+        Subsequent calls return the running cycle. Shutdown is deferred until the
+        runtime signals termination (SIGTERM) or the interpreter exits.
+        """
+        if self.lifespan_cycle is None:
+            lifespan_cycle = LifespanCycle(self.app, self.lifespan, self.loop)
+            lifespan_cycle.__enter__()
+            self.lifespan_cycle = lifespan_cycle
+            atexit.register(self.shutdown)
+            if (
+                threading.current_thread() is threading.main_thread()
+                and signal.getsignal(signal.SIGTERM) is signal.SIG_DFL
+            ):
+                signal.signal(signal.SIGTERM, self.handle_termination)
+
+        return self.lifespan_cycle
+
+    def shutdown(self) -> None:
+        """Runs application shutdown for a persistent lifespan connection, after
+        giving deferred background work one last budget to finish."""
+        self.finish_background()
+        lifespan_cycle, self.lifespan_cycle = self.lifespan_cycle, None
+        if lifespan_cycle is not None:
+            lifespan_cycle.__exit__(None, None, None)
+
+    def handle_termination(self, signum: int, frame: Optional[FrameType]) -> None:
+        # Exit through the interpreter so the `atexit` shutdown runs once the event
+        # loop has unwound, even if the signal arrives mid-invocation.
+        logger.info("Received signal %s, shutting down.", signum)
+        sys.exit(0)
+
     def __call__(self, event: LambdaEvent, context: LambdaContext) -> dict:
-        handler = self.infer(event, context)
+        if self.background_budget is not None:
+            # The stock runtime freezes the container once the handler returns, so
+            # deferred work would only resume during the next invocation.
+            raise ConfigurationError(
+                "`background_budget` is only supported by `stream` and "
+                "`mangum.runtime`, which can run work after sending the response."
+            )
+        if is_batch_event(event):
+            return self.handle_batch(event, context)
+
+        timer = PhaseTimer()
+        with timer.phase("infer"):
+            handler = self.infer(event, context)
+        cache_key, http_cycle = self.lookup(handler, timer)
+        if http_cycle is None:
+            http_cycle = self.run(handler, timer=timer)
+            self.store(cache_key, http_cycle)
+        with timer.phase("serialize"):
+            response = self.serialize(handler, http_cycle.response)
+        self.report(http_cycle, timer)
+
+        return response
+
+    async def invoke(self, event: LambdaEvent, context: LambdaContext) -> dict:
+        """
+        Handles an event on the adapter's running event loop, for callers that drive
+        the loop themselves, such as `mangum.runtime`.
+
+        A lifespan connection is not opened per invocation: start a persistent one
+        with `startup` before the loop starts running.
+        """
+        state = None
+        if self.lifespan_cycle is not None:
+            state = self.lifespan_cycle.lifespan_state
+
+        if is_batch_event(event):
+            return batch_response(
+                await self.run_batch(split_batch_event(event), context, state)
+            )
+
+        timer = PhaseTimer()
+        with timer.phase("infer"):
+            handler = self.infer(event, context)
+        cache_key, http_cycle = self.lookup(handler, timer)
+        if http_cycle is None:
+            with timer.phase("scope"):
+                http_cycle = self.prepare(handler, state)
+            with timer.phase("app"):
+                await http_cycle.run(self.app)
+            self.defer(http_cycle)
+            self.store(cache_key, http_cycle)
+        with timer.phase("serialize"):
+            response = self.serialize(handler, http_cycle.response)
+        self.report(http_cycle, timer)
+
+        return response
+
+    def stream(
+        self, event: LambdaEvent, context: LambdaContext, writer: ResponseWriter
+    ) -> None:
+        """Handles an event, streaming the response body to `writer` chunk by chunk
+        instead of buffering it for the handler."""
+        timer = PhaseTimer()
+        with timer.phase("infer"):
+            handler = self.infer(event, context)
+        http_cycle = self.run(handler, writer, timer)
+        self.report(http_cycle, timer)
+
+    @contextmanager
+    def lifespan_context(
+        self, timer: Optional[PhaseTimer] = None
+    ) -> Iterator[Optional[Dict[str, Any]]]:
+        """Runs the application inside a lifespan connection, if enabled, and yields
+        its state."""
+        timer = timer or PhaseTimer()
         with ExitStack() as stack:
-            if self.lifespan in ("auto", "on"):
-                lifespan_cycle = LifespanCycle(self.app, self.lifespan)
-                stack.enter_context(lifespan_cycle)
+            if self.lifespan not in ("auto", "on"):
+                yield None
+                return
+
+            with timer.phase("lifespan_startup"):
+                if self.persistent_lifespan:
+                    lifespan_cycle = self.startup()
+                else:
+                    lifespan_cycle = LifespanCycle(self.app, self.lifespan, self.loop)
+                    lifespan_cycle.__enter__()
+                    stack.callback(self.close_lifespan, lifespan_cycle, timer)
+            yield lifespan_cycle.lifespan_state
+
+    def close_lifespan(self, lifespan_cycle: LifespanCycle, timer: PhaseTimer) -> None:
+        with timer.phase("lifespan_shutdown"):
+            lifespan_cycle.__exit__(None, None, None)
+
+    def deadline(self, context: Optional[LambdaContext]) -> Optional[float]:
+        """
+        The time, in seconds since the epoch, by which the application must finish:
+        the invocation's remaining time less `deadline_margin`, which is kept for
+        serializing the response. The margin never takes more than half of the
+        remaining time, so a nearly expired invocation still lets the application
+        run. `None` unless `deadline_margin` is set, or when the context has no
+        remaining time.
+        """
+        get_remaining_time = getattr(context, "get_remaining_time_in_millis", None)
+        if self.deadline_margin is None or get_remaining_time is None:
+            return None
+
+        remaining = max(get_remaining_time() / 1000, 0.0)
+        return time.time() + remaining - min(self.deadline_margin, remaining / 2)
+
+    def prepare(
+        self,
+        handler: LambdaHandler,
+        state: Optional[Dict[str, Any]],
+        writer: Optional[ResponseWriter] = None,
+    ) -> HTTPCycle:
+        scope = handler.scope
+        if state is not None:
+            scope["state"] = state.copy()
+        deadline = self.deadline(scope.get("aws.context"))
+        scope["aws.deadline"] = deadline
+
+        # Built-in handlers can feed the body in bounded chunks; custom handlers only
+        # have to provide `body`.
+        iter_body = getattr(handler, "iter_body", None)
+        if iter_body is not None:
+            body = iter_body(self.request_chunk_size)
+        else:
+            body = handler.body
+
+        detach = self.background_budget is not None
+        return HTTPCycle(scope, body, self.loop, writer, deadline, detach)
+
+    def run(
+        self,
+        handler: LambdaHandler,
+        writer: Optional[ResponseWriter] = None,
+        timer: Optional[PhaseTimer] = None,
+    ) -> HTTPCycle:
+        timer = timer or PhaseTimer()
+        with self.lifespan_context(timer) as state:
+            with timer.phase("scope"):
+                http_cycle = self.prepare(handler, state, writer)
+            with timer.phase("app"):
+                http_cycle(self.app)
+            self.defer(http_cycle)
+            if writer is not None and self.background:
+                # The streamed response has been sent, so the invocation can spend
+                # its budget on background work without delaying the client.
+                with timer.phase("background"):
+                    self.loop.run_until_complete(
+                        self.drain(http_cycle.scope.get("aws.context"))
+                    )
+
+        return http_cycle
+
+    def defer(self, http_cycle: HTTPCycle) -> None:
+        """Tracks an application still running after its response was returned, when
+        background work is enabled. Applications cut off at the deadline are not
+        tracked; the cycle has already cancelled them."""
+        if http_cycle.detach and http_cycle.running and not http_cycle.timed_out:
+            assert http_cycle.app_task is not None
+            self.background.add(http_cycle.app_task)
+            http_cycle.app_task.add_done_callback(self.background.discard)
+
+    async def drain(self, context: Optional[LambdaContext] = None) -> None:
+        """
+        Waits up to `background_budget` seconds for deferred background work, and
+        never past the invocation's deadline. Work still running afterwards stays on
+        the event loop and resumes during the next invocation.
+        """
+        if not self.background or self.background_budget is None:
+            return
+
+        timeout = self.background_budget
+        deadline = self.deadline(context)
+        if deadline is not None:
+            timeout = min(timeout, deadline - time.time())
+        if timeout > 0:
+            await asyncio.wait(set(self.background), timeout=timeout)
+        if self.background:
+            logger.info(
+                "Deferring %s background task(s) to the next invocation.",
+                len(self.background),
+            )
 
-            http_cycle = HTTPCycle(handler.scope, handler.body)
-            http_response = http_cycle(self.app)
+    def finish_background(self) -> None:
+        """Drains deferred background work, then cancels whatever is left."""
+        if not self.background or self._loop is None or self._loop.is_closed():
+            return
+
+        loop = self._loop
+        loop.run_until_complete(self.drain())
+        pending = set(self.background)
+        if pending:
+            logger.warning("Cancelling %s unfinished background task(s).", len(pending))
+            for task in pending:
+                task.cancel()
+            loop.run_until_complete(asyncio.wait(pending, timeout=CANCEL_GRACE_PERIOD))
+
+    def lookup(
+        self, handler: LambdaHandler, timer: PhaseTimer
+    ) -> Tuple[Optional[Hashable], Optional[CachedResponse]]:
+        """The request's cache key, computed before the application can rewrite the
+        scope, and the cached response for it, if any."""
+        if self.cache is None:
+            return None, None
+
+        with timer.phase("cache"):
+            key = self.cache.request_key(handler.scope)
+            if key is None:
+                return None, None
+            return key, self.cache.get(key, handler.scope)
+
+    def store(self, key: Optional[Hashable], http_cycle: HTTPCycle) -> None:
+        if self.cache is not None and key is not None:
+            self.cache.put(key, http_cycle.response)
+
+    def report(
+        self, http_cycle: Union[HTTPCycle, CachedResponse], timer: PhaseTimer
+    ) -> None:
+        cold_start, self.cold_start = self.cold_start, False
+        if not self.metrics_hooks:
+            return
+
+        scope = http_cycle.scope
+        metrics: InvocationMetrics = {
+            "phases": timer.phases,
+            "cold_start": cold_start,
+            "method": scope["method"],
+            "path": scope["path"],
+            "route": getattr(scope.get("route"), "path", scope["path"]),
+            "status": http_cycle.status,
+            "request_body_size": http_cycle.request_body_size,
+            "response_body_size": http_cycle.response_body_size,
+        }
+        emit(self.metrics_hooks, metrics)
+
+    def serialize(self, handler: LambdaHandler, http_response: Response) -> dict:
+        if self.compression:
+            http_response = compress_response(
+                http_response,
+                handler.scope,
+                threshold=self.compression_threshold,
+                text_mime_types=self.text_mime_types,
+            )
+
+        return handler(http_response)
+
+    def handle_batch(self, event: Any, context: LambdaContext) -> dict:
+        """
+        Runs every record of an SQS or array batch as its own HTTP request, at most
+        `batch_concurrency` at a time on the adapter's event loop.
+
+        Records that cannot be handled or produce a 5xx response are reported in
+        `batchItemFailures`, the shape expected by SQS partial batch responses.
+        """
+        records = split_batch_event(event)
+        with self.lifespan_context() as state:
+            results = self.loop.run_until_complete(
+                self.run_batch(records, context, state)
+            )
+
+        return batch_response(results)
+
+    async def run_batch(
+        self,
+        records: List[Tuple[str, Any]],
+        context: LambdaContext,
+        state: Optional[Dict[str, Any]],
+    ) -> List[Tuple[str, Optional[dict]]]:
+        semaphore = asyncio.Semaphore(self.batch_concurrency)
 
-            return handler(http_response)
+        async def run_record(item_id: str, payload: Any) -> Tuple[str, Optional[dict]]:
+            async with semaphore:
+                try:
+                    handler = self.infer(load_batch_record(payload), context)
+                    http_cycle = self.prepare(handler, state)
+                    await http_cycle.run(self.app)
+                    self.defer(http_cycle)
+                    return item_id, self.serialize(handler, http_cycle.response)
+                except Exception:
+                    logger.exception("Unable to handle batch record %s.", item_id)
+                    return item_id, None
 
-        assert False, "unreachable"  # pragma: no cover
+        return await asyncio.gather(
+            *(run_record(item_id, payload) for item_id, payload in records)
+        )
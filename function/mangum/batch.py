@@ -0,0 +1,36 @@
+import json
+from typing import Any, List, Tuple
+
+from mangum.types import LambdaEvent
+
+
+BatchRecord = Tuple[str, Any]
+
+
+def is_batch_event(event: Any) -> bool:
+    """Detect an SQS batch or a JSON array of HTTP-shaped events."""
+    if isinstance(event, list):
+        return True
+
+    records = event.get("Records") if isinstance(event, dict) else None
+    return bool(records) and records[0].get("eventSource") == "aws:sqs"
+
+
+def split_batch_event(event: Any) -> List[BatchRecord]:
+    """
+    Split a batch event into `(item identifier, payload)` pairs.
+
+    SQS records are identified by their `messageId` and carry the HTTP event as a JSON
+    string in the message body; array items are identified by their index.
+    """
+    if isinstance(event, list):
+        return [(str(index), item) for index, item in enumerate(event)]
+
+    return [(record["messageId"], record["body"]) for record in event["Records"]]
+
+
+def load_batch_record(payload: Any) -> LambdaEvent:
+    if isinstance(payload, (str, bytes)):
+        return json.loads(payload)
+
+    return payload
@@ -0,0 +1,168 @@
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Sequence
+
+from mangum.types import Headers, Response, Scope
+
+
+# Statuses that may be cached when the application supplies an explicit lifetime.
+CACHEABLE_STATUSES = frozenset((200, 203, 204, 300, 301, 404, 405, 410, 414, 501))
+
+# Fixed per-entry cost added to the body and header sizes when enforcing the cap.
+ENTRY_OVERHEAD = 256
+
+
+def cache_control(value: str) -> Dict[str, Optional[str]]:
+    """Parse a `Cache-Control` header into a map of directive to argument."""
+    directives: Dict[str, Optional[str]] = {}
+    for item in value.split(","):
+        name, _, argument = item.strip().partition("=")
+        if name:
+            directives[name.lower()] = argument.strip('"') if argument else None
+
+    return directives
+
+
+def max_age(directives: Dict[str, Optional[str]]) -> Optional[int]:
+    for name in ("s-maxage", "max-age"):
+        try:
+            return int(directives[name] or "")
+        except (KeyError, ValueError):
+            continue
+
+    return None
+
+
+class CachedResponse:
+    """Stands in for the `HTTPCycle` of an invocation served from the cache."""
+
+    def __init__(self, scope: Scope, response: Response) -> None:
+        self.scope = scope
+        self.response = response
+        self.status = response["status"]
+        self.request_body_size = 0
+        self.response_body_size = len(response["body"])
+
+
+class CacheEntry:
+    def __init__(self, response: Response, expires_at: float, size: int) -> None:
+        self.status = response["status"]
+        self.headers = [(key, value) for key, value in response["headers"]]
+        self.body = response["body"]
+        self.stored_at = time.monotonic()
+        self.expires_at = expires_at
+        self.size = size
+
+
+class ResponseCache:
+    """
+    An in-memory cache of application responses, shared by the invocations handled
+    in one container.
+
+    Only `GET` and `HEAD` responses that carry an explicit `Cache-Control` lifetime
+    (`s-maxage` or `max-age`) are stored. Responses marked `no-store`, `no-cache` or
+    `private`, or that set cookies, are not. Requests that send `Authorization` or
+    ask for a fresh response with `Cache-Control` bypass the cache.
+
+    * **max_bytes** - Upper bound on the memory held by cached bodies and headers.
+    Least recently used entries are evicted to stay below it.
+    * **vary** - Request headers whose values are part of the cache key, in addition
+    to the method, path and query string. `Accept-Encoding` is not needed, since
+    compression is applied to each response after the cache lookup.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 16 * 1024 * 1024,
+        vary: Sequence[str] = ("accept",),
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.vary = tuple(name.lower().encode() for name in vary)
+        self.entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def request_headers(self, scope: Scope) -> Dict[bytes, bytes]:
+        return {key.lower(): value for key, value in scope["headers"]}
+
+    def is_cacheable_request(self, scope: Scope, headers: Dict[bytes, bytes]) -> bool:
+        if scope["method"] not in ("GET", "HEAD") or b"authorization" in headers:
+            return False
+        directives = cache_control(headers.get(b"cache-control", b"").decode())
+        return "no-cache" not in directives and "no-store" not in directives
+
+    def key(self, scope: Scope, headers: Dict[bytes, bytes]) -> Hashable:
+        return (
+            scope["method"],
+            scope["path"],
+            scope["query_string"],
+            tuple(headers.get(name, b"") for name in self.vary),
+        )
+
+    def request_key(self, scope: Scope) -> Optional[Hashable]:
+        """
+        The cache key of a request, or `None` when it bypasses the cache. It has to be
+        computed before the application runs, since applications may rewrite the
+        scope (Starlette's `Mount` changes `path`, for example).
+        """
+        headers = self.request_headers(scope)
+        if not self.is_cacheable_request(scope, headers):
+            return None
+
+        return self.key(scope, headers)
+
+    def get(self, key: Hashable, scope: Scope) -> Optional[CachedResponse]:
+        entry = self.entries.get(key)
+        now = time.monotonic()
+        if entry is None or entry.expires_at <= now:
+            if entry is not None:
+                self.evict(key)
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        age = str(int(now - entry.stored_at)).encode()
+        response_headers: Headers = [[name, value] for name, value in entry.headers]
+        response_headers.append([b"age", age])
+        return CachedResponse(
+            scope,
+            {"status": entry.status, "headers": response_headers, "body": entry.body},
+        )
+
+    def put(self, key: Hashable, response: Response) -> None:
+        if response["status"] not in CACHEABLE_STATUSES:
+            return
+
+        directives: Dict[str, Optional[str]] = {}
+        size = ENTRY_OVERHEAD + len(response["body"])
+        for name, value in response["headers"]:
+            name = name.lower()
+            if name == b"set-cookie" or (name == b"vary" and value.strip() == b"*"):
+                return
+            if name == b"cache-control":
+                directives.update(cache_control(value.decode()))
+            size += len(name) + len(value)
+
+        if {"no-store", "no-cache", "private"} & directives.keys():
+            return
+        lifetime = max_age(directives)
+        if not lifetime or lifetime <= 0 or size > self.max_bytes:
+            return
+
+        if key in self.entries:
+            self.evict(key)
+        self.entries[key] = CacheEntry(response, time.monotonic() + lifetime, size)
+        self.size += size
+        while self.size > self.max_bytes:
+            self.evict(next(iter(self.entries)))
+
+    def evict(self, key: Hashable) -> None:
+        entry = self.entries.pop(key)
+        self.size -= entry.size
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.size = 0
+
@@ -0,0 +1,95 @@
+import gzip
+from typing import Dict, List, Optional, Sequence
+
+from mangum.handlers.utils import is_text_mime_type
+from mangum.types import Headers, Response, Scope
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+
+def accepted_encodings(scope: Scope) -> Dict[str, float]:
+    """Parse the `Accept-Encoding` request header into a map of coding to q-value."""
+    encodings: Dict[str, float] = {}
+    for key, value in scope["headers"]:
+        if key.lower() != b"accept-encoding":
+            continue
+        for item in value.decode().split(","):
+            coding, _, params = item.strip().partition(";")
+            quality = 1.0
+            params = params.strip()
+            if params.startswith("q="):
+                try:
+                    quality = float(params[2:])
+                except ValueError:
+                    quality = 0.0
+            if coding:
+                encodings[coding.lower()] = quality
+
+    return encodings
+
+
+def choose_encoding(scope: Scope) -> Optional[str]:
+    encodings = accepted_encodings(scope)
+    if brotli is not None and encodings.get("br", 0.0) > 0:
+        return "br"
+    if encodings.get("gzip", encodings.get("*", 0.0)) > 0:
+        return "gzip"
+
+    return None
+
+
+def compress_response(
+    response: Response,
+    scope: Scope,
+    *,
+    threshold: int,
+    text_mime_types: Sequence[str],
+) -> Response:
+    """
+    Compress a response body with gzip or brotli when the client accepts it.
+
+    Only textual bodies of at least `threshold` bytes are compressed. Responses that
+    already carry a `Content-Encoding` are left untouched.
+    """
+    status, body = response["status"], response["body"]
+    if len(body) < threshold or status < 200 or status in (204, 304):
+        return response
+
+    content_type = ""
+    vary: List[str] = []
+    for key, value in response["headers"]:
+        lower_key = key.lower()
+        if lower_key == b"content-encoding":
+            return response
+        if lower_key == b"content-type":
+            content_type = value.decode()
+        elif lower_key == b"vary":
+            vary.extend(item.strip() for item in value.decode().split(","))
+
+    if not is_text_mime_type(content_type, tuple(text_mime_types)):
+        return response
+
+    encoding = choose_encoding(scope)
+    if encoding is None:
+        return response
+
+    if encoding == "br":
+        compressed = brotli.compress(body)
+    else:
+        compressed = gzip.compress(body, compresslevel=6)
+
+    headers: Headers = [
+        [key, value]
+        for key, value in response["headers"]
+        if key.lower() not in (b"content-length", b"vary")
+    ]
+    if "*" not in vary and "accept-encoding" not in (item.lower() for item in vary):
+        vary.append("Accept-Encoding")
+    headers.append([b"content-encoding", encoding.encode()])
+    headers.append([b"content-length", str(len(compressed)).encode()])
+    headers.append([b"vary", ", ".join(vary).encode()])
+
+    return {"status": status, "headers": headers, "body": compressed}
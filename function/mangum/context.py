@@ -0,0 +1,54 @@
+import time
+import uuid
+from typing import Any, Optional
+
+from mangum.types import LambdaCognitoIdentity, LambdaMobileClientContext
+
+
+class InvocationContext:
+    """
+    A concrete Lambda context object, for running the adapter outside of the managed
+    Python runtime.
+
+    * **aws_request_id** - The identifier of the invocation request.
+    * **deadline_ms** - The invocation deadline, in milliseconds since the epoch.
+    * **function_name** - The name of the Lambda function.
+    * **memory_limit_in_mb** - The amount of memory allocated for the function.
+    * **invoked_function_arn** - The ARN used to invoke the function.
+    * **trace_id** - The X-Ray tracing header of the invocation, if any.
+    """
+
+    def __init__(
+        self,
+        aws_request_id: str,
+        deadline_ms: int,
+        function_name: str = "mangum",
+        function_version: str = "$LATEST",
+        memory_limit_in_mb: int = 128,
+        invoked_function_arn: str = "",
+        log_group_name: str = "",
+        log_stream_name: str = "",
+        identity: Optional[LambdaCognitoIdentity] = None,
+        client_context: Optional[LambdaMobileClientContext] = None,
+        trace_id: Optional[str] = None,
+    ) -> None:
+        self.aws_request_id = aws_request_id
+        self.deadline_ms = deadline_ms
+        self.function_name = function_name
+        self.function_version = function_version
+        self.memory_limit_in_mb = memory_limit_in_mb
+        self.invoked_function_arn = invoked_function_arn
+        self.log_group_name = log_group_name
+        self.log_stream_name = log_stream_name
+        self.identity = identity
+        self.client_context = client_context
+        self.trace_id = trace_id
+
+    @classmethod
+    def create(cls, timeout: float, **kwargs: Any) -> "InvocationContext":
+        """A context for a new invocation that times out `timeout` seconds from now."""
+        deadline_ms = int((time.time() + timeout) * 1000)
+        return cls(str(uuid.uuid4()), deadline_ms, **kwargs)
+
+    def get_remaining_time_in_millis(self) -> int:
+        return max(self.deadline_ms - int(time.time() * 1000), 0)
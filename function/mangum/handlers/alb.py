@@ -1,10 +1,13 @@
+from functools import cached_property, lru_cache
 from itertools import islice
-from typing import Dict, Generator, List, Tuple
+from typing import Dict, Generator, Iterator, List, Tuple
 from urllib.parse import urlencode, unquote, unquote_plus
 
 from mangum.handlers.utils import (
     get_server_and_port,
     handle_base64_response_body,
+    handle_multi_value_headers,
+    iter_body_chunks,
     maybe_encode_body,
 )
 from mangum.types import (
@@ -36,13 +39,33 @@ def all_casings(input_string: str) -> Generator[str, None, None]:
                 yield first.upper() + sub_casing
 
 
+# Response headers that commonly repeat, e.g. several `set-cookie` values. Their
+# casings are computed once at import time.
+CASING_TABLE_SIZE = 16
+CASING_TABLE: Dict[str, Tuple[str, ...]] = {
+    name: tuple(islice(all_casings(name), CASING_TABLE_SIZE))
+    for name in ("set-cookie", "link", "vary", "cache-control")
+}
+
+
+@lru_cache(maxsize=256)
+def header_casings(key: str, count: int) -> Tuple[str, ...]:
+    """The first `count` casings of a header name, cached per name and count."""
+    casings = CASING_TABLE.get(key, ())
+    if len(casings) >= count:
+        return casings[:count]
+    return tuple(islice(all_casings(key), count))
+
+
 def case_mutated_headers(multi_value_headers: Dict[str, List[str]]) -> Dict[str, str]:
     """Create str/str key/value headers, with duplicate keys case mutated."""
     headers: Dict[str, str] = {}
     for key, values in multi_value_headers.items():
-        if len(values) > 0:
-            casings = list(islice(all_casings(key), len(values)))
-            for value, cased_key in zip(values, casings):
+        if len(values) == 1:
+            # The first casing of a lowercase key is the key itself.
+            headers[key] = values[0]
+        elif len(values) > 1:
+            for value, cased_key in zip(values, header_casings(key, len(values))):
                 headers[cased_key] = value
     return headers
 
@@ -94,14 +117,21 @@ class ALB:
         self.context = context
         self.config = config
 
-    @property
+    @cached_property
     def body(self) -> bytes:
         return maybe_encode_body(
             self.event.get("body", b""),
             is_base64=self.event.get("isBase64Encoded", False),
         )
 
-    @property
+    def iter_body(self, chunk_size: int) -> Iterator[bytes]:
+        return iter_body_chunks(
+            self.event.get("body", b""),
+            is_base64=self.event.get("isBase64Encoded", False),
+            chunk_size=chunk_size,
+        )
+
+    @cached_property
     def scope(self) -> Scope:
 
         headers = transform_headers(self.event)
@@ -144,16 +174,28 @@ class ALB:
         return scope
 
     def __call__(self, response: Response) -> dict:
-        multi_value_headers: Dict[str, List[str]] = {}
-        for key, value in response["headers"]:
-            lower_key = key.decode().lower()
-            if lower_key not in multi_value_headers:
-                multi_value_headers[lower_key] = []
-            multi_value_headers[lower_key].append(value.decode())
-
-        finalized_headers = case_mutated_headers(multi_value_headers)
+        headers, multi_value_headers = handle_multi_value_headers(response["headers"])
+
+        # You must use multiValueHeaders if you have enabled multi-value headers and
+        # headers otherwise. Case mutation is only needed for repeated headers in the
+        # latter.
+        multi_value_headers_enabled = "multiValueHeaders" in self.event
+        if multi_value_headers_enabled:
+            finalized_headers = {
+                **headers,
+                **{key: values[0] for key, values in multi_value_headers.items()},
+            }
+            multi_value_headers = {
+                **{key: [value] for key, value in headers.items()},
+                **multi_value_headers,
+            }
+        else:
+            finalized_headers = {
+                **headers,
+                **case_mutated_headers(multi_value_headers),
+            }
         finalized_body, is_base64_encoded = handle_base64_response_body(
-            response["body"], finalized_headers
+            response["body"], finalized_headers, self.config["text_mime_types"]
         )
 
         out = {
@@ -161,10 +203,6 @@ class ALB:
             "body": finalized_body,
             "isBase64Encoded": is_base64_encoded,
         }
-
-        # You must use multiValueHeaders if you have enabled multi-value headers and
-        # headers otherwise.
-        multi_value_headers_enabled = "multiValueHeaders" in self.scope["aws.event"]
         if multi_value_headers_enabled:
             out["multiValueHeaders"] = multi_value_headers
         else:
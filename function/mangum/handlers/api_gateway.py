@@ -1,9 +1,12 @@
-from typing import Dict, List, Tuple
+from functools import cached_property
+from typing import Dict, Iterator
 from urllib.parse import urlencode
 
 from mangum.handlers.utils import (
+    combine_headers_v2,
     get_server_and_port,
     handle_base64_response_body,
+    iter_body_chunks,
     handle_multi_value_headers,
     maybe_encode_body,
     strip_api_gateway_path,
@@ -11,7 +14,6 @@ from mangum.handlers.utils import (
 from mangum.types import (
     Response,
     LambdaConfig,
-    Headers,
     LambdaEvent,
     LambdaContext,
     QueryParams,
@@ -43,26 +45,6 @@ def _handle_multi_value_headers_for_request(event: LambdaEvent) -> Dict[str, str
     return headers
 
 
-def _combine_headers_v2(
-    input_headers: Headers,
-) -> Tuple[Dict[str, str], List[str]]:
-    output_headers: Dict[str, str] = {}
-    cookies: List[str] = []
-    for key, value in input_headers:
-        normalized_key: str = key.decode().lower()
-        normalized_value: str = value.decode()
-        if normalized_key == "set-cookie":
-            cookies.append(normalized_value)
-        else:
-            if normalized_key in output_headers:
-                normalized_value = (
-                    f"{output_headers[normalized_key]},{normalized_value}"
-                )
-            output_headers[normalized_key] = normalized_value
-
-    return output_headers, cookies
-
-
 class APIGateway:
     @classmethod
     def infer(
@@ -77,14 +59,21 @@ class APIGateway:
         self.context = context
         self.config = config
 
-    @property
+    @cached_property
     def body(self) -> bytes:
         return maybe_encode_body(
             self.event.get("body", b""),
             is_base64=self.event.get("isBase64Encoded", False),
         )
 
-    @property
+    def iter_body(self, chunk_size: int) -> Iterator[bytes]:
+        return iter_body_chunks(
+            self.event.get("body", b""),
+            is_base64=self.event.get("isBase64Encoded", False),
+            chunk_size=chunk_size,
+        )
+
+    @cached_property
     def scope(self) -> Scope:
         headers = _handle_multi_value_headers_for_request(self.event)
         return {
@@ -115,7 +104,7 @@ class APIGateway:
             response["headers"]
         )
         finalized_body, is_base64_encoded = handle_base64_response_body(
-            response["body"], finalized_headers
+            response["body"], finalized_headers, self.config["text_mime_types"]
         )
 
         return {
@@ -141,14 +130,21 @@ class HTTPGateway:
         self.context = context
         self.config = config
 
-    @property
+    @cached_property
     def body(self) -> bytes:
         return maybe_encode_body(
             self.event.get("body", b""),
             is_base64=self.event.get("isBase64Encoded", False),
         )
 
-    @property
+    def iter_body(self, chunk_size: int) -> Iterator[bytes]:
+        return iter_body_chunks(
+            self.event.get("body", b""),
+            is_base64=self.event.get("isBase64Encoded", False),
+            chunk_size=chunk_size,
+        )
+
+    @cached_property
     def scope(self) -> Scope:
         request_context = self.event["requestContext"]
         event_version = self.event["version"]
@@ -197,14 +193,14 @@ class HTTPGateway:
         }
 
     def __call__(self, response: Response) -> dict:
-        if self.scope["aws.event"]["version"] == "2.0":
-            finalized_headers, cookies = _combine_headers_v2(response["headers"])
+        if self.event["version"] == "2.0":
+            finalized_headers, cookies = combine_headers_v2(response["headers"])
 
             if "content-type" not in finalized_headers and response["body"] is not None:
                 finalized_headers["content-type"] = "application/json"
 
             finalized_body, is_base64_encoded = handle_base64_response_body(
-                response["body"], finalized_headers
+                response["body"], finalized_headers, self.config["text_mime_types"]
             )
             response_out = {
                 "statusCode": response["status"],
@@ -221,7 +217,7 @@ class HTTPGateway:
             response["headers"]
         )
         finalized_body, is_base64_encoded = handle_base64_response_body(
-            response["body"], finalized_headers
+            response["body"], finalized_headers, self.config["text_mime_types"]
         )
         return {
             "statusCode": response["status"],
@@ -1,7 +1,10 @@
-from typing import Dict, List
+from functools import cached_property
+from typing import Iterator
 
 from mangum.handlers.utils import (
+    edge_headers,
     handle_base64_response_body,
+    iter_body_chunks,
     handle_multi_value_headers,
     maybe_encode_body,
 )
@@ -30,7 +33,7 @@ class LambdaAtEdge:
         self.context = context
         self.config = config
 
-    @property
+    @cached_property
     def body(self) -> bytes:
         cf_request_body = self.event["Records"][0]["cf"]["request"].get("body", {})
         return maybe_encode_body(
@@ -38,7 +41,15 @@ class LambdaAtEdge:
             is_base64=cf_request_body.get("encoding", "") == "base64",
         )
 
-    @property
+    def iter_body(self, chunk_size: int) -> Iterator[bytes]:
+        cf_request_body = self.event["Records"][0]["cf"]["request"].get("body", {})
+        return iter_body_chunks(
+            cf_request_body.get("data"),
+            is_base64=cf_request_body.get("encoding", "") == "base64",
+            chunk_size=chunk_size,
+        )
+
+    @cached_property
     def scope(self) -> Scope:
         cf_request = self.event["Records"][0]["cf"]["request"]
         scheme_header = cf_request["headers"].get("cloudfront-forwarded-proto", [{}])
@@ -77,14 +88,13 @@ class LambdaAtEdge:
         }
 
     def __call__(self, response: Response) -> dict:
-        multi_value_headers, _ = handle_multi_value_headers(response["headers"])
+        headers, multi_value_headers = handle_multi_value_headers(response["headers"])
+        finalized_headers = edge_headers(headers, multi_value_headers)
         response_body, is_base64_encoded = handle_base64_response_body(
-            response["body"], multi_value_headers
+            response["body"],
+            {name: values[0]["value"] for name, values in finalized_headers.items()},
+            self.config["text_mime_types"],
         )
-        finalized_headers: Dict[str, List[Dict[str, str]]] = {
-            key.decode().lower(): [{"key": key.decode().lower(), "value": val.decode()}]
-            for key, val in response["headers"]
-        }
 
         return {
             "status": response["status"],
@@ -1,5 +1,8 @@
-import base64
-from typing import Dict, List, Tuple, Union
+import binascii
+import re
+import sys
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Pattern, Sequence, Tuple, Union
 from urllib.parse import unquote
 
 from mangum.types import Headers
@@ -15,16 +18,55 @@ DEFAULT_TEXT_MIME_TYPES = [
 ]
 
 
+@lru_cache(maxsize=None)
+def text_mime_type_matcher(text_mime_types: Tuple[str, ...]) -> Pattern[str]:
+    if not text_mime_types:
+        return re.compile(r"(?!)")
+
+    return re.compile("|".join(re.escape(mime_type) for mime_type in text_mime_types))
+
+
+@lru_cache(maxsize=256)
+def is_text_mime_type(content_type: str, text_mime_types: Tuple[str, ...]) -> bool:
+    """Classify a content type once; responses repeat the same few values."""
+    return text_mime_type_matcher(text_mime_types).search(content_type) is not None
+
+
 def maybe_encode_body(body: Union[str, bytes], *, is_base64: bool) -> bytes:
     body = body or b""
     if is_base64:
-        body = base64.b64decode(body)
+        # `a2b_base64` reads an ASCII str in place, skipping the intermediate bytes
+        # copy made by `base64.b64decode`.
+        body = binascii.a2b_base64(body)
     elif not isinstance(body, bytes):
         body = body.encode()
 
     return body
 
 
+def iter_body_chunks(
+    body: Optional[Union[str, bytes]], *, is_base64: bool, chunk_size: int
+) -> Iterator[bytes]:
+    """
+    Yield the decoded request body in chunks of at most `chunk_size` bytes.
+
+    Base64 bodies are decoded one slice at a time, so the full decoded body never has
+    to exist in memory at once.
+    """
+    body = body or b""
+    if is_base64 and isinstance(body, str) and "\n" not in body and "\r" not in body:
+        # Every 4 base64 characters decode to 3 bytes, so slices on a 4-character
+        # boundary decode independently.
+        step = max(chunk_size // 3, 1) * 4
+        for start in range(0, len(body), step):
+            yield binascii.a2b_base64(body[start : start + step])
+        return
+
+    data = memoryview(maybe_encode_body(body, is_base64=is_base64))
+    for start in range(0, len(data), chunk_size):
+        yield data[start : start + chunk_size].tobytes()
+
+
 def get_server_and_port(headers: dict) -> Tuple[str, int]:
     server_name = headers.get("host", "mangum")
     if ":" not in server_name:
@@ -49,43 +91,110 @@ def strip_api_gateway_path(path: str, *, api_gateway_base_path: str) -> str:
     return unquote(path)
 
 
+# Header names that Starlette and FastAPI emit on nearly every response. Raw names
+# are mapped to interned lowercase strings, so repeated names are decoded once per
+# process rather than once per response.
+COMMON_RESPONSE_HEADERS = (
+    "access-control-allow-credentials",
+    "access-control-allow-origin",
+    "cache-control",
+    "content-disposition",
+    "content-encoding",
+    "content-length",
+    "content-type",
+    "date",
+    "etag",
+    "last-modified",
+    "link",
+    "location",
+    "server",
+    "set-cookie",
+    "vary",
+)
+HEADER_NAME_CACHE_SIZE = 512
+
+_header_names: Dict[bytes, str] = {}
+for _name in COMMON_RESPONSE_HEADERS:
+    for _raw in (_name, _name.title()):
+        _header_names[_raw.encode()] = sys.intern(_name)
+
+
+def decode_header_name(key: bytes) -> str:
+    name = _header_names.get(key)
+    if name is None:
+        name = sys.intern(key.decode().lower())
+        if len(_header_names) < HEADER_NAME_CACHE_SIZE:
+            _header_names[key] = name
+    return name
+
+
 def handle_multi_value_headers(
     response_headers: Headers,
 ) -> Tuple[Dict[str, str], Dict[str, List[str]]]:
+    """
+    Decode every response header pair exactly once, splitting single values into
+    `headers` and repeated values into `multi_value_headers`. The API Gateway v1,
+    ALB and Lambda@Edge shapes are derived from this pair.
+    """
+    names = _header_names
     headers: Dict[str, str] = {}
     multi_value_headers: Dict[str, List[str]] = {}
     for key, value in response_headers:
-        lower_key = key.decode().lower()
-        if lower_key in multi_value_headers:
-            multi_value_headers[lower_key].append(value.decode())
-        elif lower_key in headers:
-            # Move existing to multi_value_headers and append current
-            multi_value_headers[lower_key] = [
-                headers[lower_key],
-                value.decode(),
-            ]
-            del headers[lower_key]
+        name = names.get(key) or decode_header_name(key)
+        if name in multi_value_headers:
+            multi_value_headers[name].append(value.decode())
+        elif name in headers:
+            multi_value_headers[name] = [headers.pop(name), value.decode()]
         else:
-            headers[lower_key] = value.decode()
+            headers[name] = value.decode()
     return headers, multi_value_headers
 
 
-def handle_base64_response_body(
-    body: bytes, headers: Dict[str, str]
-) -> Tuple[str, bool]:
-    is_base64_encoded = False
-    output_body = ""
-    if body != b"":
-        for text_mime_type in DEFAULT_TEXT_MIME_TYPES:
-            if text_mime_type in headers.get("content-type", ""):
-                try:
-                    output_body = body.decode()
-                except UnicodeDecodeError:
-                    output_body = base64.b64encode(body).decode()
-                    is_base64_encoded = True
-                break
+def combine_headers_v2(response_headers: Headers) -> Tuple[Dict[str, str], List[str]]:
+    """
+    HTTP API v2 shape, built in a single pass: repeated values are comma-joined and
+    `set-cookie` values are collected into `cookies`.
+    """
+    names = _header_names
+    headers: Dict[str, str] = {}
+    cookies: List[str] = []
+    for key, value in response_headers:
+        name = names.get(key) or decode_header_name(key)
+        if name == "set-cookie":
+            cookies.append(value.decode())
+        elif name in headers:
+            headers[name] = f"{headers[name]},{value.decode()}"
         else:
-            output_body = base64.b64encode(body).decode()
-            is_base64_encoded = True
+            headers[name] = value.decode()
+    return headers, cookies
 
-    return output_body, is_base64_encoded
+
+def edge_headers(
+    headers: Dict[str, str], multi_value_headers: Dict[str, List[str]]
+) -> Dict[str, List[Dict[str, str]]]:
+    """Lambda@Edge shape. The last value sent for a header wins."""
+    edge = {name: [{"key": name, "value": value}] for name, value in headers.items()}
+    for name, values in multi_value_headers.items():
+        edge[name] = [{"key": name, "value": values[-1]}]
+    return edge
+
+
+def handle_base64_response_body(
+    body: bytes,
+    headers: Dict[str, str],
+    text_mime_types: Sequence[str] = DEFAULT_TEXT_MIME_TYPES,
+) -> Tuple[str, bool]:
+    if not body:
+        return "", False
+
+    content_type = headers.get("content-type", "")
+    content_encoding = headers.get("content-encoding", "identity")
+    if content_encoding == "identity" and is_text_mime_type(
+        content_type, tuple(text_mime_types)
+    ):
+        try:
+            return body.decode(), False
+        except UnicodeDecodeError:
+            pass
+
+    return binascii.b2a_base64(memoryview(body), newline=False).decode("ascii"), True
@@ -0,0 +1,11 @@
+import asyncio
+
+
+def new_event_loop() -> asyncio.AbstractEventLoop:
+    """Create a new event loop, using `uvloop` when it is installed."""
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.new_event_loop()
+
+    return uvloop.new_event_loop()
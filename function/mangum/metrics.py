@@ -0,0 +1,119 @@
+import json
+import logging
+import sys
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Sequence, TextIO
+
+from typing_extensions import TypedDict
+
+
+logger = logging.getLogger("mangum.metrics")
+
+
+class InvocationMetrics(TypedDict):
+    """
+    Measurements for a single invocation, passed to every metrics hook.
+
+    * **phases** - Seconds spent in each phase, measured with a monotonic clock:
+    `infer`, `cache`, `lifespan_startup`, `scope`, `app`, `background`,
+    `lifespan_shutdown` and `serialize`. Phases that did not run are omitted; a
+    response served from the response cache has no `scope` or `app` phase, and
+    `background` only covers deferred work waited on before the invocation ends.
+    * **cold_start** - Whether this was the first invocation handled by the adapter.
+    * **route** - The matched route template when the application exposes one in the
+    scope (as FastAPI does), otherwise the request path.
+    * **request_body_size** / **response_body_size** - Body sizes in bytes.
+    """
+
+    phases: Dict[str, float]
+    cold_start: bool
+    method: str
+    path: str
+    route: str
+    status: int
+    request_body_size: int
+    response_body_size: int
+
+
+MetricsHook = Callable[[InvocationMetrics], None]
+
+
+class PhaseTimer:
+    def __init__(self) -> None:
+        self.phases: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + (
+                time.perf_counter() - start
+            )
+
+
+class EMFEmitter:
+    """
+    A metrics hook that prints CloudWatch Embedded Metric Format records to stdout,
+    where the Lambda log agent turns them into metrics without any API calls.
+
+    * **namespace** - The CloudWatch metrics namespace.
+    * **dimensions** - Fields to use as metric dimensions. Any of `Route`, `Method`
+    and `Status`.
+    """
+
+    def __init__(
+        self,
+        namespace: str = "Mangum",
+        dimensions: Sequence[str] = ("Route",),
+        stream: TextIO = sys.stdout,
+    ) -> None:
+        self.namespace = namespace
+        self.dimensions = list(dimensions)
+        self.stream = stream
+
+    def __call__(self, metrics: InvocationMetrics) -> None:
+        values = {
+            f"{name.title().replace('_', '')}Duration": round(seconds * 1000, 3)
+            for name, seconds in metrics["phases"].items()
+        }
+        values["RequestBodySize"] = metrics["request_body_size"]
+        values["ResponseBodySize"] = metrics["response_body_size"]
+        units = {
+            name: "Bytes" if name.endswith("Size") else "Milliseconds"
+            for name in values
+        }
+        values["ColdStart"] = int(metrics["cold_start"])
+        units["ColdStart"] = "Count"
+
+        record = {
+            "_aws": {
+                "Timestamp": int(time.time() * 1000),
+                "CloudWatchMetrics": [
+                    {
+                        "Namespace": self.namespace,
+                        "Dimensions": [self.dimensions],
+                        "Metrics": [
+                            {"Name": name, "Unit": unit} for name, unit in units.items()
+                        ],
+                    }
+                ],
+            },
+            "Route": metrics["route"],
+            "Method": metrics["method"],
+            "Status": str(metrics["status"]),
+            "Path": metrics["path"],
+            **values,
+        }
+        self.stream.write(json.dumps(record) + "\n")
+        self.stream.flush()
+
+
+def emit(hooks: Sequence[MetricsHook], metrics: InvocationMetrics) -> None:
+    for hook in hooks:
+        try:
+            hook(metrics)
+        except Exception:
+            logger.exception("Metrics hook %r failed.", hook)
@@ -1,12 +1,17 @@
 import asyncio
 import enum
 import logging
-from io import BytesIO
+import time
+from typing import Iterable, List, Optional, Union
 
-from mangum.types import ASGI, Message, Scope, Response
+from mangum.types import ASGI, Message, Scope, Response, ResponseWriter
 from mangum.exceptions import UnexpectedMessage
 
 
+# Seconds a cancelled application gets to unwind before the timeout response is sent.
+CANCEL_GRACE_PERIOD = 0.05
+
+
 class HTTPCycleState(enum.Enum):
     """
     The state of the ASGI `http` connection.
@@ -14,11 +19,14 @@ class HTTPCycleState(enum.Enum):
     connection scope containing the `http` type.
     * **RESPONSE** - The `http.response.start` event has been sent by the application.
     The next expected message is the `http.response.body` event, containing the body
-    content. An application may pass the `more_body` argument to send content in chunks,
-    however content will always be returned in a single response, never streamed.
+    content. An application may pass the `more_body` argument to send content in chunks.
+    Content is returned in a single response unless a response writer is provided, in
+    which case each chunk is streamed to the writer as it is sent.
     * **COMPLETE** - The body content from the ASGI application has been completely
     read. A disconnect event will be sent to the application, and the response will
-    be returned.
+    be returned. When the cycle is detached, the response is returned without
+    waiting for the application to finish, so work it does after sending the
+    response (such as background tasks) continues on the event loop.
     """
 
     REQUEST = enum.auto()
@@ -27,35 +35,91 @@ class HTTPCycleState(enum.Enum):
 
 
 class HTTPCycle:
-    def __init__(self, scope: Scope, body: bytes) -> None:
+    def __init__(
+        self,
+        scope: Scope,
+        body: Union[bytes, Iterable[bytes]],
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        writer: Optional[ResponseWriter] = None,
+        deadline: Optional[float] = None,
+        detach: bool = False,
+    ) -> None:
         self.scope = scope
-        self.buffer = BytesIO()
+        self.loop = loop or asyncio.get_event_loop()
+        self.writer = writer
+        self.deadline = deadline
+        self.detach = detach
+        self.timed_out = False
+        self.app_task: "Optional[asyncio.Task[None]]" = None
+        self.response_complete: "asyncio.Future[None]" = self.loop.create_future()
+        self.chunks: List[bytes] = []
+        self.request_body_size = 0
+        self.response_body_size = 0
         self.state = HTTPCycleState.REQUEST
         self.logger = logging.getLogger("mangum.http")
         self.app_queue: asyncio.Queue[Message] = asyncio.Queue()
-        self.app_queue.put_nowait(
-            {
-                "type": "http.request",
-                "body": body,
-                "more_body": False,
-            }
-        )
+        # The request body is delivered lazily, one `http.request` message per chunk,
+        # with a single chunk of lookahead to determine `more_body`.
+        self.body_chunks = iter((body,) if isinstance(body, bytes) else body)
+        self.next_body_chunk: Optional[bytes] = next(self.body_chunks, b"")
 
     def __call__(self, app: ASGI) -> Response:
         asgi_instance = self.run(app)
-        loop = asyncio.get_event_loop()
-        asgi_task = loop.create_task(asgi_instance)
-        loop.run_until_complete(asgi_task)
+        asgi_task = self.loop.create_task(asgi_instance)
+        self.loop.run_until_complete(asgi_task)
+
+        return self.response
 
+    @property
+    def response(self) -> Response:
         return {
             "status": self.status,
             "headers": self.headers,
             "body": self.body,
         }
 
+    @property
+    def running(self) -> bool:
+        """Whether the application is still running after the cycle returned."""
+        return self.app_task is not None and not self.app_task.done()
+
     async def run(self, app: ASGI) -> None:
+        if self.deadline is None and not self.detach:
+            await self.run_app(app)
+            return
+
+        # The application runs as its own task so it can be cancelled at the
+        # deadline, leaving time to return a response before Lambda stops the
+        # invocation, or left running once the response is complete.
+        app_task = self.app_task = self.loop.create_task(self.run_app(app))
+        waiters = {app_task, self.response_complete} if self.detach else {app_task}
+        timeout = None if self.deadline is None else self.deadline - time.time()
+        await asyncio.wait(
+            waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+        )
+        if app_task.done() or (self.detach and self.response_complete.done()):
+            return
+
+        self.timed_out = True
+        app_task.cancel()
+        await asyncio.wait({app_task}, timeout=CANCEL_GRACE_PERIOD)
+        if not app_task.done():
+            # The application suppressed the cancellation. It is cancelled again but
+            # no longer waited for, and never treated as background work.
+            self.logger.warning(
+                "The application did not stop within %ss of being cancelled: %s %s",
+                CANCEL_GRACE_PERIOD,
+                self.scope["method"],
+                self.scope["path"],
+            )
+            app_task.cancel()
+        await self.handle_timeout()
+
+    async def run_app(self, app: ASGI) -> None:
         try:
             await app(self.scope, self.receive, self.send)
+        except asyncio.CancelledError:
+            raise
         except BaseException:
             self.logger.exception("An error occurred running the application.")
             if self.state is HTTPCycleState.REQUEST:
@@ -73,12 +137,60 @@ class HTTPCycle:
                         "more_body": False,
                     }
                 )
+            elif self.state is not HTTPCycleState.COMPLETE and self.writer is not None:
+                # The status has already been streamed, so the response can only be
+                # cut short.
+                self.state = HTTPCycleState.COMPLETE
+                self.body = b""
+                await self.writer.close()
             elif self.state is not HTTPCycleState.COMPLETE:
                 self.status = 500
                 self.body = b"Internal Server Error"
                 self.headers = [[b"content-type", b"text/plain; charset=utf-8"]]
 
+    async def handle_timeout(self) -> None:
+        self.logger.error(
+            "The application did not complete before the deadline: %s %s",
+            self.scope["method"],
+            self.scope["path"],
+        )
+        if self.state is HTTPCycleState.REQUEST:
+            await self.send(
+                {
+                    "type": "http.response.start",
+                    "status": 504,
+                    "headers": [[b"content-type", b"text/plain; charset=utf-8"]],
+                }
+            )
+            await self.send(
+                {
+                    "type": "http.response.body",
+                    "body": b"Gateway Timeout",
+                    "more_body": False,
+                }
+            )
+        elif self.state is HTTPCycleState.RESPONSE and self.writer is not None:
+            self.state = HTTPCycleState.COMPLETE
+            self.body = b""
+            await self.writer.close()
+        elif self.state is HTTPCycleState.RESPONSE:
+            self.state = HTTPCycleState.COMPLETE
+            self.status = 504
+            self.body = b"Gateway Timeout"
+            self.headers = [[b"content-type", b"text/plain; charset=utf-8"]]
+            self.chunks = []
+
     async def receive(self) -> Message:
+        if self.next_body_chunk is not None:
+            body = self.next_body_chunk
+            self.next_body_chunk = next(self.body_chunks, None)
+            self.request_body_size += len(body)
+            return {
+                "type": "http.request",
+                "body": body,
+                "more_body": self.next_body_chunk is not None,
+            }
+
         return await self.app_queue.get()  # pragma: no cover
 
     async def send(self, message: Message) -> None:
@@ -89,6 +201,8 @@ class HTTPCycle:
             self.status = message["status"]
             self.headers = message.get("headers", [])
             self.state = HTTPCycleState.RESPONSE
+            if self.writer is not None:
+                await self.writer.start(self.status, self.headers)
         elif (
             self.state is HTTPCycleState.RESPONSE
             and message["type"] == "http.response.body"
@@ -96,12 +210,23 @@ class HTTPCycle:
 
             body = message.get("body", b"")
             more_body = message.get("more_body", False)
-            self.buffer.write(body)
+            self.response_body_size += len(body)
+            if self.writer is not None:
+                if body:
+                    await self.writer.write(body)
+            elif body:
+                self.chunks.append(body)
             if not more_body:
-                self.body = self.buffer.getvalue()
-                self.buffer.close()
+                # A single chunk is the common case and is used without copying.
+                self.body = (
+                    self.chunks[0] if len(self.chunks) == 1 else b"".join(self.chunks)
+                )
+                self.chunks = []
+                if self.writer is not None:
+                    await self.writer.close()
 
                 self.state = HTTPCycleState.COMPLETE
+                self.response_complete.set_result(None)
                 await self.app_queue.put({"type": "http.disconnect"})
 
                 self.logger.info(
@@ -2,7 +2,7 @@ import asyncio
 import enum
 import logging
 from types import TracebackType
-from typing import Optional, Type
+from typing import Any, Dict, Optional, Type
 
 from mangum.types import ASGI, LifespanMode, Message
 from mangum.exceptions import LifespanUnsupported, LifespanFailure, UnexpectedMessage
@@ -40,6 +40,8 @@ class LifespanCycle:
     specification. This will usually be an ASGI framework application instance.
     * **lifespan** - A string to configure lifespan support. Choices are `auto`, `on`,
     and `off`. Default is `auto`.
+    * **loop** - The event loop used to run the application. Defaults to the current
+    event loop.
     * **state** - An enumerated `LifespanCycleState` type that indicates the state of
     the ASGI connection.
     * **exception** - An exception raised while handling the ASGI event. This may or
@@ -50,17 +52,25 @@ class LifespanCycle:
     startup flow.
     * **shutdown_event** - An asyncio event object used to control the application
     shutdown flow.
+    * **lifespan_state** - A dict passed to the application as the lifespan `state`.
+    Anything stored here during startup is shallow-copied into each request scope.
     """
 
-    def __init__(self, app: ASGI, lifespan: LifespanMode) -> None:
+    def __init__(
+        self,
+        app: ASGI,
+        lifespan: LifespanMode,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+    ) -> None:
         self.app = app
         self.lifespan = lifespan
         self.state: LifespanCycleState = LifespanCycleState.CONNECTING
         self.exception: Optional[BaseException] = None
-        self.loop = asyncio.get_event_loop()
+        self.loop = loop or asyncio.get_event_loop()
         self.app_queue: asyncio.Queue[Message] = asyncio.Queue()
         self.startup_event: asyncio.Event = asyncio.Event()
         self.shutdown_event: asyncio.Event = asyncio.Event()
+        self.lifespan_state: Dict[str, Any] = {}
         self.logger = logging.getLogger("mangum.lifespan")
 
     def __enter__(self) -> None:
@@ -81,7 +91,11 @@ class LifespanCycle:
         """Calls the application with the `lifespan` connection scope."""
         try:
             await self.app(
-                {"type": "lifespan", "asgi": {"spec_version": "2.0", "version": "3.0"}},
+                {
+                    "type": "lifespan",
+                    "asgi": {"spec_version": "2.0", "version": "3.0"},
+                    "state": self.lifespan_state,
+                },
                 self.receive,
                 self.send,
             )
@@ -0,0 +1,341 @@
+import argparse
+import asyncio
+import importlib
+import json
+import logging
+import os
+import sys
+import traceback
+from contextlib import suppress
+from types import SimpleNamespace
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from mangum.adapter import Mangum
+from mangum.context import InvocationContext
+from mangum.exceptions import ConfigurationError
+from mangum.types import LambdaEvent
+
+
+logger = logging.getLogger("mangum.runtime")
+
+
+RUNTIME_API_VERSION = "2018-06-01"
+
+Connection = Tuple[asyncio.StreamReader, asyncio.StreamWriter]
+
+
+async def read_response(
+    reader: asyncio.StreamReader,
+) -> Tuple[int, Dict[str, str], bytes]:
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionResetError("The Runtime API closed the connection.")
+    status = int(status_line.split()[1])
+
+    headers: Dict[str, str] = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    if "content-length" in headers:
+        body = await reader.readexactly(int(headers["content-length"]))
+    elif headers.get("transfer-encoding", "").lower() == "chunked":
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            chunk = await reader.readexactly(size + 2)
+            if not size:
+                break
+            chunks.append(chunk[:-2])
+        body = b"".join(chunks)
+    else:
+        body = b""
+
+    return status, headers, body
+
+
+class RuntimeAPIClient:
+    """
+    A minimal HTTP/1.1 client for the Lambda Runtime API. Connections are kept alive
+    and reused across requests, so polling for invocations does not open a new
+    connection every time.
+    """
+
+    def __init__(self, address: str) -> None:
+        host, _, port = address.rpartition(":")
+        self.host = host
+        self.port = int(port)
+        self.idle: List[Connection] = []
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        body: bytes = b"",
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> Tuple[int, Dict[str, str], bytes]:
+        head = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}"]
+        head.append(f"Content-Length: {len(body)}")
+        head.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+        message = ("\r\n".join(head) + "\r\n\r\n").encode("latin-1")
+
+        while True:
+            reused = bool(self.idle)
+            if reused:
+                reader, writer = self.idle.pop()
+            else:
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+            try:
+                writer.writelines((message, body))
+                await writer.drain()
+                status, response_headers, response_body = await read_response(reader)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                writer.close()
+                if reused:
+                    # The API closed an idle connection; retry on a new one.
+                    continue
+                raise
+            except BaseException:
+                writer.close()
+                raise
+            break
+
+        if response_headers.get("connection", "").lower() == "close":
+            writer.close()
+        else:
+            self.idle.append((reader, writer))
+
+        return status, response_headers, response_body
+
+    async def next_invocation(self) -> Tuple[Dict[str, str], bytes]:
+        path = f"/{RUNTIME_API_VERSION}/runtime/invocation/next"
+        status, headers, body = await self.request("GET", path)
+        if status != 200:
+            raise RuntimeError(f"Unable to fetch the next invocation: {status}")
+        return headers, body
+
+    async def post_response(self, request_id: str, body: bytes) -> None:
+        path = f"/{RUNTIME_API_VERSION}/runtime/invocation/{request_id}/response"
+        status, _, response_body = await self.request("POST", path, body)
+        if status >= 300:
+            logger.error("Response for %s was rejected: %s", request_id, response_body)
+
+    async def post_error(self, request_id: str, error: dict) -> None:
+        path = f"/{RUNTIME_API_VERSION}/runtime/invocation/{request_id}/error"
+        await self.post_error_to(path, error)
+
+    async def post_init_error(self, error: dict) -> None:
+        await self.post_error_to(f"/{RUNTIME_API_VERSION}/runtime/init/error", error)
+
+    async def post_error_to(self, path: str, error: dict) -> None:
+        headers = {"Lambda-Runtime-Function-Error-Type": "Unhandled"}
+        await self.request("POST", path, json.dumps(error).encode(), headers)
+
+    def close(self) -> None:
+        for _, writer in self.idle:
+            writer.close()
+        self.idle = []
+
+
+def error_payload(exc: BaseException) -> dict:
+    return {
+        "errorMessage": str(exc),
+        "errorType": type(exc).__name__,
+        "stackTrace": traceback.format_tb(exc.__traceback__),
+    }
+
+
+def context_from_headers(headers: Mapping[str, str]) -> InvocationContext:
+    """The context for an invocation, from the `/next` response headers and the
+    function's environment."""
+    identity = client_context = None
+    if "lambda-runtime-cognito-identity" in headers:
+        cognito = json.loads(headers["lambda-runtime-cognito-identity"])
+        identity = SimpleNamespace(
+            cognito_identity_id=cognito.get("cognitoIdentityId"),
+            cognito_identity_pool_id=cognito.get("cognitoIdentityPoolId"),
+        )
+    if "lambda-runtime-client-context" in headers:
+        mobile = json.loads(headers["lambda-runtime-client-context"])
+        client_context = SimpleNamespace(
+            client=SimpleNamespace(**mobile.get("client", {})),
+            custom=mobile.get("custom"),
+            env=mobile.get("env"),
+        )
+
+    return InvocationContext(
+        headers["lambda-runtime-aws-request-id"],
+        int(headers["lambda-runtime-deadline-ms"]),
+        function_name=os.environ.get("AWS_LAMBDA_FUNCTION_NAME", "mangum"),
+        function_version=os.environ.get("AWS_LAMBDA_FUNCTION_VERSION", "$LATEST"),
+        memory_limit_in_mb=int(os.environ.get("AWS_LAMBDA_FUNCTION_MEMORY_SIZE", 128)),
+        invoked_function_arn=headers.get("lambda-runtime-invoked-function-arn", ""),
+        log_group_name=os.environ.get("AWS_LAMBDA_LOG_GROUP_NAME", ""),
+        log_stream_name=os.environ.get("AWS_LAMBDA_LOG_STREAM_NAME", ""),
+        identity=identity,
+        client_context=client_context,
+        trace_id=headers.get("lambda-runtime-trace-id"),
+    )
+
+
+class LambdaRuntime:
+    """
+    Serves invocations from the Lambda Runtime API with a `Mangum` adapter. This is
+    the entry point of a custom runtime (`provided.al2`), replacing the stock Python
+    runtime's bootstrap.
+
+    * **adapter** - The `Mangum` instance that handles every event.
+    * **concurrency** - The number of invocations processed at once. Each worker
+    fetches its next invocation as soon as it has posted a response, so fetching
+    overlaps with the other workers' application code. The standard Runtime API
+    hands out one invocation at a time per container; values above 1 only help with
+    an API that supports concurrent invocations.
+    * **runtime_api** - The `host:port` of the Runtime API. Defaults to the
+    `AWS_LAMBDA_RUNTIME_API` environment variable.
+
+    Each invocation's trace ID is available as `context.trace_id`. The process-wide
+    `_X_AMZN_TRACE_ID` variable read by the X-Ray SDK is only set with a concurrency
+    of 1, since concurrent workers would overwrite each other's value.
+
+    When the adapter has a `background_budget`, each worker posts the response as
+    soon as it is complete and only then spends the budget on the application's
+    background work, before fetching the next invocation.
+    """
+
+    def __init__(
+        self,
+        adapter: Mangum,
+        concurrency: int = 1,
+        runtime_api: Optional[str] = None,
+    ) -> None:
+        runtime_api = runtime_api or os.environ.get("AWS_LAMBDA_RUNTIME_API")
+        if not runtime_api:
+            raise ConfigurationError(
+                "The Runtime API address is not set. Pass `runtime_api` or set "
+                "AWS_LAMBDA_RUNTIME_API."
+            )
+        if concurrency < 1:
+            raise ConfigurationError(
+                "Invalid argument supplied for `concurrency`. Must be at least 1."
+            )
+
+        self.adapter = adapter
+        self.concurrency = concurrency
+        self.client = RuntimeAPIClient(runtime_api)
+
+    async def serve(self) -> None:
+        await asyncio.gather(*(self.worker() for _ in range(self.concurrency)))
+
+    async def worker(self) -> None:
+        while True:
+            headers, body = await self.client.next_invocation()
+            context = context_from_headers(headers)
+            if self.concurrency == 1 and context.trace_id is not None:
+                os.environ["_X_AMZN_TRACE_ID"] = context.trace_id
+
+            try:
+                event: LambdaEvent = json.loads(body)
+                response = await self.adapter.invoke(event, context)
+            except Exception as exc:
+                logger.exception("Invocation %s failed.", context.aws_request_id)
+                await self.client.post_error(
+                    context.aws_request_id, error_payload(exc)
+                )
+            else:
+                await self.client.post_response(
+                    context.aws_request_id, json.dumps(response).encode()
+                )
+            await self.adapter.drain(context)
+
+    def run(self) -> None:
+        """Starts the application lifespan once, then serves invocations on the
+        adapter's event loop until the process is terminated."""
+        adapter = self.adapter
+        if adapter.lifespan in ("auto", "on"):
+            adapter.startup()
+
+        loop = adapter.loop
+        serve_task = loop.create_task(self.serve())
+        try:
+            loop.run_until_complete(serve_task)
+        finally:
+            serve_task.cancel()
+            with suppress(asyncio.CancelledError):
+                loop.run_until_complete(serve_task)
+            self.client.close()
+            adapter.shutdown()
+
+
+def load_adapter(
+    target: str, lifespan: str = "auto", background_budget: Optional[float] = None
+) -> Mangum:
+    """
+    Import `module:attribute`, or `module.attribute` as in the function's handler
+    setting. A `Mangum` instance is used as-is; anything else is treated as an ASGI
+    application and wrapped in one. The wrapper keeps a persistent lifespan, since
+    the runtime and the local server are long-lived processes.
+    """
+    if ":" in target or "." not in target:
+        module_name, _, attribute = target.partition(":")
+    else:
+        module_name, _, attribute = target.rpartition(".")
+    obj = getattr(importlib.import_module(module_name), attribute or "app")
+    if isinstance(obj, Mangum):
+        return obj
+
+    return Mangum(
+        obj,
+        lifespan=lifespan,
+        persistent_lifespan=True,
+        background_budget=background_budget,
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m mangum.runtime",
+        description=(
+            "Serve an ASGI application as a Lambda custom runtime. Use it as the "
+            "`bootstrap` of a provided.al2 function."
+        ),
+    )
+    parser.add_argument(
+        "target",
+        nargs="?",
+        default=os.environ.get("_HANDLER"),
+        help="module:attribute or module.attribute, e.g. app:app. Defaults to the "
+        "function's handler.",
+    )
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--lifespan", choices=("auto", "on", "off"), default="auto")
+    parser.add_argument(
+        "--background-budget",
+        type=float,
+        default=None,
+        help="Seconds of background work allowed after each response is posted.",
+    )
+    args = parser.parse_args(argv)
+    if not args.target:
+        parser.error("a target is required when _HANDLER is not set")
+
+    logging.basicConfig(level=logging.INFO)
+    sys.path.insert(0, os.environ.get("LAMBDA_TASK_ROOT", os.getcwd()))
+    try:
+        adapter = load_adapter(args.target, args.lifespan, args.background_budget)
+        runtime = LambdaRuntime(adapter, args.concurrency)
+    except Exception as exc:
+        logger.exception("Unable to initialize the function.")
+        runtime_api = os.environ.get("AWS_LAMBDA_RUNTIME_API")
+        if runtime_api:
+            client = RuntimeAPIClient(runtime_api)
+            asyncio.run(client.post_init_error(error_payload(exc)))
+        sys.exit(1)
+
+    runtime.run()
+
+
+if __name__ == "__main__":
+    main()
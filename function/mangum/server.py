@@ -0,0 +1,461 @@
+import argparse
+import base64
+import logging
+import os
+import queue
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from mangum.context import InvocationContext
+from mangum.handlers.utils import DEFAULT_TEXT_MIME_TYPES, is_text_mime_type
+from mangum.runtime import load_adapter
+from mangum.types import LambdaContext, LambdaEvent
+
+
+logger = logging.getLogger("mangum.server")
+
+
+LambdaFunction = Callable[[LambdaEvent, LambdaContext], dict]
+
+EVENT_FORMATS = ("v1", "v2", "alb", "edge")
+
+# Hop-by-hop and framing headers are set by the server itself.
+EXCLUDED_RESPONSE_HEADERS = frozenset(
+    ("connection", "content-length", "keep-alive", "transfer-encoding")
+)
+
+
+def encode_request_body(body: bytes, content_type: str) -> Tuple[Optional[str], bool]:
+    """Encode a request body the way API Gateway does: text as-is, anything else as
+    base64."""
+    if not body:
+        return None, False
+    if not content_type or is_text_mime_type(
+        content_type, tuple(DEFAULT_TEXT_MIME_TYPES)
+    ):
+        try:
+            return body.decode(), False
+        except UnicodeDecodeError:
+            pass
+
+    return base64.b64encode(body).decode("ascii"), True
+
+
+def raw_query_params(query_string: str) -> Dict[str, List[str]]:
+    """Split a query string without decoding it, as the load balancer does."""
+    params: Dict[str, List[str]] = {}
+    for pair in query_string.split("&"):
+        if pair:
+            key, _, value = pair.partition("=")
+            params.setdefault(key, []).append(value)
+    return params
+
+
+def build_event(
+    event_format: str,
+    method: str,
+    target: str,
+    headers: Iterable[Tuple[str, str]],
+    body: bytes,
+    client_ip: str,
+    request_id: str,
+) -> LambdaEvent:
+    """
+    Convert an HTTP request into the event a Lambda function receives for it.
+
+    * **event_format** - `v1` (API Gateway REST API), `v2` (HTTP API and function
+    URLs), `alb` (Application Load Balancer) or `edge` (Lambda@Edge).
+    * **target** - The request target: the raw path and query string.
+    """
+    path, _, query_string = target.partition("?")
+    header_pairs = [(name, value) for name, value in headers]
+    multi_value_headers: Dict[str, List[str]] = {}
+    for name, value in header_pairs:
+        multi_value_headers.setdefault(name.lower(), []).append(value)
+    single_headers = {name: values[-1] for name, values in multi_value_headers.items()}
+    data, is_base64 = encode_request_body(body, single_headers.get("content-type", ""))
+
+    if event_format == "v1":
+        query_params = parse_qs(query_string, keep_blank_values=True)
+        return {
+            "resource": "/{proxy+}",
+            "path": path,
+            "httpMethod": method,
+            "headers": single_headers,
+            "multiValueHeaders": multi_value_headers,
+            "queryStringParameters": {
+                key: values[-1] for key, values in query_params.items()
+            }
+            or None,
+            "multiValueQueryStringParameters": query_params or None,
+            "pathParameters": {"proxy": path.lstrip("/")},
+            "stageVariables": None,
+            "requestContext": {
+                "resourcePath": "/{proxy+}",
+                "httpMethod": method,
+                "path": path,
+                "stage": "$default",
+                "requestId": request_id,
+                "identity": {
+                    "sourceIp": client_ip,
+                    "userAgent": single_headers.get("user-agent"),
+                },
+            },
+            "body": data,
+            "isBase64Encoded": is_base64,
+        }
+
+    if event_format == "v2":
+        cookies = [
+            cookie
+            for header in multi_value_headers.pop("cookie", [])
+            for cookie in header.split("; ")
+            if cookie
+        ]
+        event: LambdaEvent = {
+            "version": "2.0",
+            "routeKey": "$default",
+            "rawPath": path,
+            "rawQueryString": query_string,
+            "headers": {
+                name: ",".join(values) for name, values in multi_value_headers.items()
+            },
+            "requestContext": {
+                "http": {
+                    "method": method,
+                    "path": path,
+                    "protocol": "HTTP/1.1",
+                    "sourceIp": client_ip,
+                    "userAgent": single_headers.get("user-agent", ""),
+                },
+                "requestId": request_id,
+                "routeKey": "$default",
+                "stage": "$default",
+                "timeEpoch": int(time.time() * 1000),
+            },
+            "body": data,
+            "isBase64Encoded": is_base64,
+        }
+        if cookies:
+            event["cookies"] = cookies
+        if query_string:
+            event["queryStringParameters"] = {
+                key: ",".join(values)
+                for key, values in parse_qs(query_string).items()
+            }
+        return event
+
+    if event_format == "alb":
+        return {
+            "requestContext": {
+                "elb": {
+                    "targetGroupArn": (
+                        "arn:aws:elasticloadbalancing:local:000000000000:"
+                        "targetgroup/mangum/0000000000000000"
+                    )
+                }
+            },
+            "httpMethod": method,
+            "path": path,
+            "queryStringParameters": {
+                key: values[-1]
+                for key, values in raw_query_params(query_string).items()
+            },
+            "headers": single_headers,
+            "body": data or "",
+            "isBase64Encoded": is_base64,
+        }
+
+    if event_format == "edge":
+        edge_headers: Dict[str, List[Dict[str, str]]] = {}
+        for name, value in header_pairs:
+            edge_headers.setdefault(name.lower(), []).append(
+                {"key": name, "value": value}
+            )
+        request: Dict[str, Any] = {
+            "clientIp": client_ip,
+            "headers": edge_headers,
+            "method": method,
+            "querystring": query_string,
+            "uri": path,
+        }
+        if data is not None:
+            request["body"] = {
+                "inputTruncated": False,
+                "action": "read-only",
+                "encoding": "base64" if is_base64 else "text",
+                "data": data,
+            }
+        return {
+            "Records": [
+                {
+                    "cf": {
+                        "config": {
+                            "distributionDomainName": single_headers.get("host", ""),
+                            "distributionId": "EMANGUMLOCAL",
+                            "eventType": "origin-request",
+                            "requestId": request_id,
+                        },
+                        "request": request,
+                    }
+                }
+            ]
+        }
+
+    raise ValueError(f"Unknown event format: {event_format}")
+
+
+def decode_response(
+    event_format: str, response: dict
+) -> Tuple[int, List[Tuple[str, str]], bytes]:
+    """Convert a Lambda function response back into an HTTP status, headers and body."""
+    headers: List[Tuple[str, str]] = []
+    if event_format == "edge":
+        status = int(response["status"])
+        for values in (response.get("headers") or {}).values():
+            headers.extend((header["key"], header["value"]) for header in values)
+        body = response.get("body") or ""
+        # Mangum's Lambda@Edge handler reports `isBase64Encoded`; CloudFront's own
+        # field is `bodyEncoding`.
+        is_base64 = bool(response.get("isBase64Encoded")) or (
+            response.get("bodyEncoding") == "base64"
+        )
+    else:
+        status = int(response["statusCode"])
+        headers.extend((response.get("headers") or {}).items())
+        for name, values in (response.get("multiValueHeaders") or {}).items():
+            headers.extend((name, value) for value in values)
+        headers.extend(("set-cookie", cookie) for cookie in response.get("cookies", []))
+        body = response.get("body") or ""
+        is_base64 = response.get("isBase64Encoded", False)
+
+    return status, headers, base64.b64decode(body) if is_base64 else body.encode()
+
+
+class LambdaRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "LambdaHTTPServer"
+
+    def handle_invocation(self) -> None:
+        if "chunked" in self.headers.get("transfer-encoding", "").lower():
+            # Lambda events always carry the complete body.
+            self.send_error(411)
+            return
+
+        content_length = int(self.headers.get("content-length") or 0)
+        body = self.rfile.read(content_length) if content_length else b""
+        context = self.server.create_context()
+        event = build_event(
+            self.server.event_format,
+            self.command,
+            self.path,
+            self.headers.items(),
+            body,
+            self.client_address[0],
+            context.aws_request_id,
+        )
+        try:
+            response = self.server.invoke(event, context)
+            status, headers, response_body = decode_response(
+                self.server.event_format, response
+            )
+        except Exception:
+            # API Gateway answers with a 502 when the function errors.
+            logger.exception("The Lambda function raised an error.")
+            self.send_error(502)
+            return
+
+        self.send_response(status)
+        for name, value in headers:
+            if name.lower() not in EXCLUDED_RESPONSE_HEADERS:
+                self.send_header(name, value)
+        self.send_header("Content-Length", str(len(response_body)))
+        self.send_header("X-Amzn-RequestId", context.aws_request_id)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(response_body)
+
+    do_GET = do_HEAD = do_POST = do_PUT = do_PATCH = handle_invocation
+    do_DELETE = do_OPTIONS = handle_invocation
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+class LambdaHTTPServer(ThreadingHTTPServer):
+    """
+    A local HTTP server that turns every request into a Lambda event and invokes a
+    function with it.
+
+    Connections are accepted on threads, but invocations run one at a time on the
+    thread calling `process_invocations`, as they would in a single container.
+
+    * **function** - The Lambda function, typically a `Mangum` instance.
+    * **event_format** - One of `v1`, `v2`, `alb` or `edge`.
+    * **invocation_timeout** - Seconds until each invocation's context deadline.
+    """
+
+    allow_reuse_address = True
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(
+        self,
+        server_address: Tuple[str, int],
+        function: LambdaFunction,
+        event_format: str = "v2",
+        invocation_timeout: float = 6.0,
+        function_name: str = "mangum",
+    ) -> None:
+        if event_format not in EVENT_FORMATS:
+            raise ValueError(f"Unknown event format: {event_format}")
+
+        super().__init__(server_address, LambdaRequestHandler)
+        self.function = function
+        self.event_format = event_format
+        self.invocation_timeout = invocation_timeout
+        self.function_name = function_name
+        self.invocations: "queue.Queue[Tuple[LambdaEvent, LambdaContext, Future]]" = (
+            queue.Queue()
+        )
+
+    def create_context(self) -> InvocationContext:
+        return InvocationContext.create(
+            self.invocation_timeout, function_name=self.function_name
+        )
+
+    def invoke(self, event: LambdaEvent, context: LambdaContext) -> dict:
+        future: Future = Future()
+        self.invocations.put((event, context, future))
+        return future.result()
+
+    def process_invocations(self) -> None:
+        while True:
+            try:
+                event, context, future = self.invocations.get(timeout=0.5)
+            except queue.Empty:
+                # A signal that arrives just before a blocking wait would not
+                # interrupt it, so wake regularly to run pending handlers.
+                continue
+            if not future.set_running_or_notify_cancel():
+                continue  # pragma: no cover
+            try:
+                future.set_result(self.function(event, context))
+            except BaseException as exc:
+                future.set_exception(exc)
+                if not isinstance(exc, Exception):
+                    raise
+
+
+def accept_connections(server: LambdaHTTPServer) -> None:
+    # Connection threads inherit this mask, so termination signals are always
+    # delivered to the main thread, where they interrupt the invocation loop.
+    signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGINT, signal.SIGTERM})
+    server.serve_forever()
+
+
+def run_worker(server: LambdaHTTPServer) -> None:
+    """Serve requests as a single warm container until interrupted or terminated."""
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    accept_thread = threading.Thread(
+        target=accept_connections, args=(server,), daemon=True
+    )
+    accept_thread.start()
+    try:
+        server.process_invocations()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        server.shutdown()
+        server.server_close()
+        shutdown = getattr(server.function, "shutdown", None)
+        if shutdown is not None:
+            shutdown()
+
+
+def serve(server: LambdaHTTPServer, workers: int = 1) -> None:
+    """
+    Serve on one process, or pre-fork `workers` processes that share the listening
+    socket. Every worker is its own container: it cold-starts on its first request
+    and keeps its event loop and lifespan state between requests.
+    """
+    if workers <= 1:
+        run_worker(server)
+        return
+
+    pids = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover
+            run_worker(server)
+            os._exit(0)
+        pids.append(pid)
+
+    server.server_close()
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        for pid in pids:
+            os.waitpid(pid, 0)
+    except KeyboardInterrupt:
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+                os.waitpid(pid, 0)
+            except (ChildProcessError, ProcessLookupError):
+                pass
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m mangum.server",
+        description=(
+            "Serve an ASGI application through Mangum, converting every HTTP request "
+            "into a Lambda event."
+        ),
+    )
+    parser.add_argument(
+        "target", help="module:attribute or module.attribute, e.g. app:app"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--format", choices=EVENT_FORMATS, default="v2")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=6.0,
+        help="seconds until each invocation's deadline",
+    )
+    parser.add_argument("--lifespan", choices=("auto", "on", "off"), default="auto")
+    parser.add_argument("--log-level", default="INFO")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=args.log_level.upper())
+    sys.path.insert(0, os.getcwd())
+    function = load_adapter(args.target, args.lifespan)
+    server = LambdaHTTPServer(
+        (args.host, args.port),
+        function,
+        event_format=args.format,
+        invocation_timeout=args.timeout,
+        function_name=args.target,
+    )
+    logger.info(
+        "Serving %s as %s events on http://%s:%d with %d worker(s).",
+        args.target,
+        args.format,
+        args.host,
+        args.port,
+        args.workers,
+    )
+    serve(server, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import json
+from typing import BinaryIO
+
+from mangum.handlers.utils import combine_headers_v2
+from mangum.types import Headers
+
+
+# Lambda response streaming for HTTP integrations (function URLs) expects a JSON
+# prelude with the status and headers, followed by this delimiter and the body.
+STREAMING_CONTENT_TYPE = "application/vnd.awslambda.http-integration-response"
+PRELUDE_DELIMITER = b"\x00" * 8
+
+
+def encode_prelude(status: int, headers: Headers) -> bytes:
+    finalized_headers, cookies = combine_headers_v2(headers)
+    prelude = {"statusCode": status, "headers": finalized_headers}
+    if cookies:
+        prelude["cookies"] = cookies
+
+    return json.dumps(prelude).encode() + PRELUDE_DELIMITER
+
+
+class FileResponseWriter:
+    """
+    Writes a streamed response to a binary file or pipe in the format used by
+    Lambda response streaming. Each chunk is flushed as soon as it is written.
+
+    * **fileobj** - A writable binary file object. It is flushed, but not closed,
+    when the response completes.
+    """
+
+    def __init__(self, fileobj: BinaryIO) -> None:
+        self.fileobj = fileobj
+
+    async def start(self, status: int, headers: Headers) -> None:
+        self.fileobj.write(encode_prelude(status, headers))
+        self.fileobj.flush()
+
+    async def write(self, chunk: bytes) -> None:
+        self.fileobj.write(chunk)
+        self.fileobj.flush()
+
+    async def close(self) -> None:
+        self.fileobj.flush()
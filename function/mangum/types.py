@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 from typing import (
     List,
     Dict,
@@ -106,6 +107,7 @@ class ASGI(Protocol):
 
 
 LifespanMode: TypeAlias = Literal["auto", "on", "off"]
+LoopFactory: TypeAlias = Callable[[], asyncio.AbstractEventLoop]
 
 
 class Response(TypedDict):
@@ -114,8 +116,20 @@ class Response(TypedDict):
     body: bytes
 
 
+class ResponseWriter(Protocol):
+    async def start(self, status: int, headers: Headers) -> None:
+        ...  # pragma: no cover
+
+    async def write(self, chunk: bytes) -> None:
+        ...  # pragma: no cover
+
+    async def close(self) -> None:
+        ...  # pragma: no cover
+
+
 class LambdaConfig(TypedDict):
     api_gateway_base_path: str
+    text_mime_types: Sequence[str]
 
 
 class LambdaHandler(Protocol):